@@ -1,3 +1,6 @@
+from . import cli
+from . import controllers
 from . import models
 from . import wizards
+from . import report
 from .hooks import _fix_sequence_on_install
@@ -1,14 +1,22 @@
 {
     "name": "Broiler Farm - Gestión de Pollos de Engorde",
-    "version": "1.0.0",
+    "version": "1.0.5",
     "category": "Operations/Agriculture",
     "summary": "Control de lotes, registros diarios y costos por compras en granja de pollos de engorde",
     "depends": ["base", "mail", "purchase", "stock", "mrp", "web"],
+    "external_dependencies": {"python": ["numpy"]},
     "data": [
         "security/ir.model.access.csv",
         "data/picking_type_salida_broiler.xml",
+        "data/flock_sequence.xml",
+        "data/product_broiler_feed_consumption.xml",
         "data/reprocess_stock_moves.xml",
+        "data/rebuild_flock_kpis.xml",
         "data/cron_refresh_dashboard.xml",
+        "data/cron_flock_age_rollover.xml",
+        "data/cron_stock_sync_queue.xml",
+        "data/cron_reprocess_jobs.xml",
+        "data/cron_report_jobs.xml",
         "report/report_salida_broiler.xml",
         "report/report_broiler_flock.xml",
 
@@ -16,7 +24,16 @@
         "views/broiler_flock_views.xml",
         "views/broiler_daily_log_views.xml",
         "views/purchase_order_views.xml",
+        "views/stock_picking_type_views.xml",
+        "views/res_company_views.xml",
         "views/broiler_flock_cost_wizard_views.xml",
+        "views/broiler_flock_cost_line_views.xml",
+        "views/broiler_daily_log_import_wizard_views.xml",
+        "views/broiler_data_export_wizard_views.xml",
+        "views/broiler_reprocess_job_views.xml",
+        "views/broiler_report_job_views.xml",
+        "views/broiler_perf_stat_views.xml",
+        "views/broiler_sb_validate_wizard_views.xml",
         "views/broiler_feed_consumption_views.xml",
         "views/broiler_farm_dashboard_views.xml",
         "views/broiler_menu.xml",
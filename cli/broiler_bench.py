@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Benchmark del módulo sobre una granja sintética.
+
+    odoo-bin broiler_bench -c odoo.conf -d base_de_pruebas --companies 2 --flocks 20 \\
+        --days 42 --output bench.json
+
+Genera empresas, productos de alimento con stock, lotes activos y sus registros diarios
+(``tools/bench.FarmBench``), mide las rutas críticas (tiempo real y cantidad de
+consultas SQL) y escribe el resultado en JSON para comparar versiones. Todo se hace en
+una transacción que se revierte al final (salvo ``--keep``); conviene usar una base de
+pruebas. La misma medición corre como caso ``post_install`` con la etiqueta
+``broiler_bench``, fuera de las pruebas estándar.
+"""
+import argparse
+import random
+
+import odoo
+from odoo.cli import Command
+from odoo.tools import config
+
+from ..tools.bench import FarmBench, write_report
+
+
+class BroilerBench(Command):
+    """Mide las rutas críticas del módulo broiler_farm sobre datos sintéticos"""
+    name = "broiler_bench"
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(prog="odoo-bin broiler_bench", description=self.__doc__)
+        parser.add_argument("--companies", type=int, default=1, help="Empresas a generar")
+        parser.add_argument("--flocks", type=int, default=10, help="Lotes por empresa")
+        parser.add_argument("--days", type=int, default=42, help="Días de registros por lote")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla del generador")
+        parser.add_argument("--output", default="broiler_bench.json", help="Archivo JSON de resultados")
+        parser.add_argument("--keep", action="store_true", help="Confirmar los datos generados")
+        args, odoo_args = parser.parse_known_args(cmdargs)
+        config.parse_config(odoo_args)
+        dbname = config["db_name"]
+        if isinstance(dbname, list):
+            dbname = dbname[0] if dbname else None
+        if not dbname:
+            parser.error("Indique la base de datos con -d")
+
+        params = {"companies": args.companies, "flocks": args.flocks, "days": args.days, "seed": args.seed}
+        registry = odoo.modules.registry.Registry(dbname)
+        with registry.cursor() as cr:
+            env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {"tracking_disable": True})
+            try:
+                results = FarmBench(env, random.Random(args.seed)).run(args.companies, args.flocks, args.days)
+                report = write_report(args.output, env, params, results)
+            finally:
+                if not args.keep:
+                    cr.rollback()
+        for row in report["results"]:
+            print("%-32s %10.3f s %8d consultas" % (row["path"], row["wall_s"], row["queries"]))
+        print("Resultados en %s" % args.output)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+from datetime import timezone
+
+from werkzeug.exceptions import BadRequest, Forbidden
+from werkzeug.http import http_date, quote_etag
+
+from odoo import http
+from odoo.http import request
+
+# {(base de datos, empresa): (etag, cuerpo JSON)} de este proceso
+_payload_cache = {}
+_payload_cache_lock = threading.Lock()
+
+
+class BroilerDashboardController(http.Controller):
+
+    @http.route("/broiler_farm/dashboard/data", type="http", auth="user", methods=["GET"])
+    def dashboard_data(self, company_id=None, **kwargs):
+        """KPIs y gráficos del dashboard en JSON para pantallas que consultan seguido.
+
+        La versión se toma del ``write_date`` del resumen persistido de la empresa: con
+        ``If-None-Match`` / ``If-Modified-Since`` vigentes se responde 304 tras leer solo
+        ese resumen (y sus marcas de cambios), sin leer lotes ni pickings.
+        """
+        env = request.env
+        # El resumen se lee con sudo: solo usuarios internos con acceso de lectura
+        snapshot_model = env["broiler.farm.dashboard.snapshot"]
+        if not env.user._is_internal() or not snapshot_model.has_access("read"):
+            raise Forbidden()
+        company = env.company
+        if company_id:
+            if not company_id.isdigit():
+                raise BadRequest("company_id debe ser un id numérico")
+            company = env["res.company"].browse(int(company_id))
+            if company not in env.user.company_ids:
+                raise Forbidden()
+
+        snapshot = snapshot_model.sudo()
+        # Recalcula antes las secciones marcadas por cambios (nada si no hubo cambios)
+        snapshot._refresh_dirty([company.id])
+        env.cr.execute(
+            "SELECT id, write_date FROM broiler_farm_dashboard_snapshot WHERE company_id = %s",
+            [company.id],
+        )
+        row = env.cr.fetchone()
+        if row:
+            snapshot = snapshot.browse(row[0])
+            write_date = row[1]
+        else:
+            snapshot = snapshot._get_snapshot(company)
+            write_date = snapshot.write_date
+
+        etag = "%s-%s-%s" % (env.cr.dbname, company.id, write_date.strftime("%Y%m%d%H%M%S%f"))
+        last_modified = write_date.replace(microsecond=0, tzinfo=timezone.utc)
+        headers = [
+            ("ETag", quote_etag(etag)),
+            ("Last-Modified", http_date(last_modified)),
+            ("Cache-Control", "private, no-cache"),
+        ]
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            not_modified = httprequest.if_none_match.contains(etag)
+        else:
+            not_modified = bool(httprequest.if_modified_since and httprequest.if_modified_since >= last_modified)
+        if not_modified:
+            return request.make_response("", headers=headers, status=304)
+
+        key = (env.cr.dbname, company.id)
+        cached = _payload_cache.get(key)
+        if cached and cached[0] == etag:
+            body = cached[1]
+        else:
+            body = json.dumps(snapshot._get_dashboard_payload())
+            with _payload_cache_lock:
+                _payload_cache[key] = (etag, body)
+        return request.make_response(body, headers=headers + [("Content-Type", "application/json")])
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import SUPERUSER_ID, api
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Los acumulados del lote dejan de ser computados: se reconstruyen una vez."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    flocks = env["broiler.flock"].search([])
+    flocks._rebuild_kpis()
+    _logger.info("KPIs reconstruidos para %s lotes", len(flocks))
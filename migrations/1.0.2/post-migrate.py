@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """El cron del dashboard (noupdate) pasa a recalcular los resúmenes persistidos."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cron = env.ref("broiler_farm.ir_cron_broiler_flock_refresh", raise_if_not_found=False)
+    if cron:
+        cron.code = "model._cron_refresh_snapshots()"
+    env["broiler.farm.dashboard.snapshot"]._refresh_companies()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Marca las ubicaciones "Broiler"/"Consumo" existentes con su función broiler.
+
+    Antes se buscaban por nombre; una de cada función por empresa (la más antigua).
+    """
+    cr.execute("""
+        UPDATE stock_location loc
+           SET broiler_role = 'parent'
+          FROM (
+                SELECT MIN(id) AS id
+                  FROM stock_location
+                 WHERE name = 'Broiler' AND usage = 'internal'
+              GROUP BY COALESCE(company_id, 0)
+          ) first_loc
+         WHERE loc.id = first_loc.id
+    """)
+    cr.execute("""
+        UPDATE stock_location loc
+           SET broiler_role = 'consumption'
+          FROM (
+                SELECT MIN(child.id) AS id
+                  FROM stock_location child
+                  JOIN stock_location parent ON parent.id = child.location_id
+                 WHERE child.name = 'Consumo' AND parent.broiler_role = 'parent'
+              GROUP BY COALESCE(child.company_id, 0)
+          ) first_loc
+         WHERE loc.id = first_loc.id
+    """)
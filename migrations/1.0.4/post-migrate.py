@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Pasa los costos acumulados en el lote a líneas de saldo inicial del libro de costos.
+
+    Las columnas cost_feed/total_cost quedan en la tabla (ya no se usan): el alimento pasa
+    como línea "feed" y el resto del total como línea "other".
+    """
+    cr.execute("""
+        INSERT INTO broiler_flock_cost_line
+               (flock_id, company_id, date, cost_type, amount, description,
+                create_uid, write_uid, create_date, write_date)
+        SELECT f.id, f.company_id, COALESCE(f.date_in::date, CURRENT_DATE), t.cost_type, t.amount,
+               'Saldo inicial', %(uid)s, %(uid)s, now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC'
+          FROM broiler_flock f
+         CROSS JOIN LATERAL (VALUES
+               ('feed', COALESCE(f.cost_feed, 0)),
+               ('other', COALESCE(f.total_cost, 0) - COALESCE(f.cost_feed, 0))
+         ) AS t(cost_type, amount)
+         WHERE t.amount <> 0
+    """, {"uid": SUPERUSER_ID})
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["broiler.farm.dashboard.snapshot"]._refresh_companies()
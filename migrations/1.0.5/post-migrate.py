@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Primera proyección de cosecha de los lotes activos (luego se refresca con cada pesaje)."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["broiler.flock"].search([("state", "=", "active")])._refresh_forecasts()
@@ -1,8 +1,20 @@
+from . import broiler_perf_stat
+from . import res_company
+from . import broiler_growth
 from . import broiler_flock
+from . import broiler_flock_cost_line
 from . import broiler_daily_log
+from . import broiler_stock_sync_queue
+from . import broiler_reprocess_job
+from . import broiler_report_job
+from . import broiler_data_export
 from . import broiler_farm_dashboard
+from . import broiler_farm_dashboard_snapshot
+from . import product_product
 from . import purchase_order
+from . import stock_location
 from . import stock_move
 from . import stock_picking
+from . import stock_picking_type
 from . import mrp_production
 from . import broiler_feed_consumption
\ No newline at end of file
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
+from odoo.tools import float_compare
+
+from .broiler_perf_stat import broiler_perf
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -16,6 +21,7 @@ class BroilerDailyLog(models.Model):
         "broiler.flock", string="Lote",
         required=True, ondelete="cascade", index=True, tracking=True
     )
+    company_id = fields.Many2one(related="flock_id.company_id", store=True, index=True)
     name = fields.Char(string="Referencia", readonly=True, copy=False)
     date = fields.Date(
         string="Fecha", required=True,
@@ -73,6 +79,26 @@ class BroilerDailyLog(models.Model):
     medication = fields.Text(string="Medicación")
     vaccine = fields.Text(string="Vacuna")
 
+    stock_sync_state = fields.Selection(
+        [("synced", "Sincronizado"), ("pending", "Pendiente"), ("error", "Error")],
+        string="Estado stock",
+        default="synced",
+        readonly=True,
+        copy=False,
+    )
+    stock_sync_error = fields.Text(string="Error de sincronización", readonly=True, copy=False)
+
+    # Curva de crecimiento (broiler.growth.engine), calculada para todo el lote a la vez
+    growth_age_day = fields.Integer(string="Día", compute="_compute_growth_series")
+    growth_alive_qty = fields.Integer(string="Aves vivas (día)", compute="_compute_growth_series")
+    growth_weight_g = fields.Float(string="Peso estimado (g)", digits=(16, 1), compute="_compute_growth_series")
+    growth_adg_g = fields.Float(string="GDP (g/día)", digits=(16, 1), compute="_compute_growth_series")
+    growth_feed_per_bird_g = fields.Float(
+        string="Alimento acum./ave (g)", digits=(16, 1), compute="_compute_growth_series",
+    )
+    growth_fcr_daily = fields.Float(string="FCR del día", digits=(16, 3), compute="_compute_growth_series")
+    growth_fcr_cumulative = fields.Float(string="FCR acumulado", digits=(16, 3), compute="_compute_growth_series")
+
     stock_move_ids = fields.One2many(
         "stock.move",
         "broiler_daily_log_id",
@@ -83,6 +109,12 @@ class BroilerDailyLog(models.Model):
 
     _sql_constraints = []
 
+    # Campos que alteran los acumulados del lote (broiler.flock._apply_log_kpi_changes)
+    _KPI_TRIGGER_FIELDS = {
+        "flock_id", "date", "dead_qty", "culled_qty",
+        "feed_starter_kg", "feed_finisher_kg", "water_l", "avg_weight_g",
+    }
+
     # -----------------------
     # DEBUG / LOG
     # -----------------------
@@ -138,123 +170,256 @@ class BroilerDailyLog(models.Model):
     # -----------------------
     # STOCK
     # -----------------------
+    @api.depends(
+        "flock_id.initial_qty", "flock_id.initial_weight_g", "flock_id.date_in",
+        "date", "feed_kg", "dead_qty", "culled_qty", "avg_weight_g",
+    )
+    def _compute_growth_series(self):
+        # La serie de un registro depende de los anteriores: se calcula el lote completo
+        values = self.env["broiler.growth.engine"]._compute_series(self.flock_id)
+        for rec in self:
+            series = values.get(rec.id, {})
+            rec.growth_age_day = round(series.get("age_day", 0))
+            rec.growth_alive_qty = round(series.get("alive_qty", 0))
+            rec.growth_weight_g = series.get("weight_g", 0.0)
+            rec.growth_adg_g = series.get("adg_g", 0.0)
+            rec.growth_feed_per_bird_g = series.get("feed_per_bird_g", 0.0)
+            rec.growth_fcr_daily = series.get("fcr_daily", 0.0)
+            rec.growth_fcr_cumulative = series.get("fcr_cumulative", 0.0)
+
     def _get_salida_broiler_picking_type(self):
-        picking_type = self.env.ref(
-            'broiler_farm.picking_type_salida_broiler', raise_if_not_found=False
-        )
-        if not picking_type:
-            picking_type = self.env['stock.picking.type'].search([
-                ('sequence_code', '=', 'SB'),
-                ('code', '=', 'outgoing'),
-            ], limit=1)
-        return picking_type
+        return (self[:1].company_id or self.env.company)._broiler_get_salida_picking_type()
 
-    def _sync_stock_consumption_moves(self):
-        self.ensure_one()
-        flock = self.flock_id
-        if not flock:
-            _logger.warning(f'Registro diario {self.id}: No hay lote asignado')
-            return
-
-        starter = (
-            self.env["product.product"].search(
-                [("product_tmpl_id", "=", self.feed_starter_product_tmpl_id.id)], limit=1
-            )
-            if self.feed_starter_product_tmpl_id
-            else False
-        )
-        finisher = (
-            self.env["product.product"].search(
-                [("product_tmpl_id", "=", self.feed_finisher_product_tmpl_id.id)], limit=1
-            )
-            if self.feed_finisher_product_tmpl_id
-            else False
-        )
+    def _get_feed_variants(self):
+        """Variante de cada plantilla de alimento de los registros: {tmpl_id: product}."""
+        templates = self.feed_starter_product_tmpl_id | self.feed_finisher_product_tmpl_id
+        return self.env["product.product"]._broiler_get_single_variant_by_template(templates)
 
+    def _get_consumption_lines(self, variant_by_tmpl):
+        """Consumo registrado: [(etiqueta, producto, cantidad)]."""
+        self.ensure_one()
         want_starter = float(self.feed_starter_kg or 0.0)
         want_finisher = float(self.feed_finisher_kg or 0.0)
-
         _logger.info(f'Registro diario {self.id}: starter={want_starter}, finisher={want_finisher}')
 
-        if self.stock_move_ids:
-            pickings_to_remove = self.stock_move_ids.mapped('picking_id')
-            moves_to_remove = self.stock_move_ids
-            for move in moves_to_remove:
-                if move.state == 'done':
-                    move.state = 'assigned'
-                elif move.state not in ('draft', 'waiting', 'confirmed', 'assigned', 'cancel'):
-                    move.state = 'cancel'
-            for picking in pickings_to_remove:
-                if picking.state == 'done':
-                    for m in picking.move_ids:
-                        m.state = 'assigned'
-                    picking.state = 'assigned'
-                if picking.state != 'cancel':
-                    picking.action_cancel()
-            moves_to_remove.filtered(lambda m: m.state == 'cancel').unlink()
-            pickings_to_remove.filtered(lambda p: p.state == 'cancel').unlink()
-
-        if want_starter <= 0 and want_finisher <= 0:
-            _logger.info(f'Registro diario {self.id}: Sin consumo de alimento, no se crea picking')
-            return
-
-        picking_type = self._get_salida_broiler_picking_type()
-        if not picking_type:
-            _logger.error(f'No se encontró picking type Salida Broiler')
-            raise ValidationError(
-                "No se encontró el tipo de operación 'Salida Broiler'. "
-                "Reinstala el módulo broiler_farm."
-            )
-
-        src = picking_type.default_location_src_id or self.env.ref("stock.stock_location_stock")
-        dest = picking_type.default_location_dest_id
-        if not dest:
-            dest = flock._get_consumption_location()
-
-        picking = self.env['stock.picking'].create({
-            'picking_type_id': picking_type.id,
-            'location_id': src.id,
-            'location_dest_id': dest.id,
-            'origin': 'Consumo %s - %s' % (flock.name, self.date),
-            'scheduled_date': self.date,
-            'broiler_flock_id': flock.id,
-        })
-
-        move_vals_list = []
+        lines = []
+        starter = variant_by_tmpl.get(self.feed_starter_product_tmpl_id.id)
         if want_starter > 0 and starter:
-            move_vals_list.append({
-                'reference': 'Consumo Inicio %s' % starter.display_name,
-                'product_id': starter.id,
-                'product_uom_qty': want_starter,
-                'product_uom': starter.uom_id.id,
-                'location_id': src.id,
-                'location_dest_id': dest.id,
-                'picking_id': picking.id,
-                'broiler_daily_log_id': self.id,
-                'origin': picking.origin,
-            })
-
+            lines.append(('Consumo Inicio', starter, want_starter))
+        finisher = variant_by_tmpl.get(self.feed_finisher_product_tmpl_id.id)
         if want_finisher > 0 and finisher:
-            move_vals_list.append({
-                'reference': 'Consumo Final %s' % finisher.display_name,
-                'product_id': finisher.id,
-                'product_uom_qty': want_finisher,
-                'product_uom': finisher.uom_id.id,
-                'location_id': src.id,
-                'location_dest_id': dest.id,
-                'picking_id': picking.id,
-                'broiler_daily_log_id': self.id,
-                'origin': picking.origin,
-            })
+            lines.append(('Consumo Final', finisher, want_finisher))
+        return lines
 
-        if not move_vals_list:
-            picking.unlink()
-            return
+    def _is_reusable_consumption_picking(self, picking, consolidated):
+        """Si un movimiento abierto del registro puede quedarse en su picking actual."""
+        self.ensure_one()
+        if not picking or picking.state in ('done', 'cancel'):
+            return False
+        if consolidated:
+            return picking.broiler_consolidated and picking.broiler_consumption_date == self.date
+        return not picking.broiler_consolidated
 
-        self.env['stock.move'].create(move_vals_list)
+    @broiler_perf
+    def _sync_stock_consumption_moves(self):
+        """Sincroniza por diferencias los movimientos de consumo con lo registrado.
+
+        Por registro y producto se compara lo registrado con lo ya consumido (movimientos
+        hechos menos devoluciones hechas):
+        - si solo cambia la cantidad se ajusta la demanda del movimiento abierto y se
+          vuelve a reservar;
+        - los movimientos de productos que ya no se consumen se cancelan y se crean
+          movimientos nuevos solo para productos nuevos;
+        - si lo ya consumido supera lo registrado se genera una devolución por la
+          diferencia en vez de reescribir el estado de los movimientos hechos.
+        Todo el conjunto se resuelve con un create de pickings, uno de movimientos y una
+        confirmación/reserva.
+        """
+        logs = self.filtered('flock_id')
+        for rec in self - logs:
+            _logger.warning(f'Registro diario {rec.id}: No hay lote asignado')
+        if not logs:
+            return
+        if len(logs.company_id) > 1:
+            # Tipo de operación y ubicaciones se resuelven por empresa
+            for company in logs.company_id:
+                logs.filtered(lambda l: l.company_id == company)._sync_stock_consumption_moves()
+            return
 
-        picking.action_confirm()
-        picking.action_assign()
+        Move = self.env['stock.move']
+        picking_type = self._get_salida_broiler_picking_type()
+        consolidated = bool(picking_type and picking_type.broiler_consolidate_daily)
+        variant_by_tmpl = logs._get_feed_variants()
+
+        moves_to_cancel = Move
+        qty_by_move = {}
+        new_out = []  # (registro, etiqueta, producto, cantidad)
+        new_ret = []
+        out_picking_by_rec = {}
+        ret_picking_by_rec = {}
+        for rec in logs:
+            desired = defaultdict(float)
+            labels = {}
+            for label, product, qty in rec._get_consumption_lines(variant_by_tmpl):
+                desired[product] += qty
+                labels.setdefault(product, label)
+
+            done_net = defaultdict(float)
+            open_out = defaultdict(lambda: Move)
+            open_ret = defaultdict(lambda: Move)
+            for move in rec.stock_move_ids.filtered(lambda m: m.state != 'cancel'):
+                outgoing = move.location_id.usage == 'internal'
+                if move.state == 'done':
+                    done_net[move.product_id] += move.quantity if outgoing else -move.quantity
+                elif not outgoing:
+                    open_ret[move.product_id] |= move
+                    ret_picking_by_rec.setdefault(rec, move.picking_id)
+                elif rec._is_reusable_consumption_picking(move.picking_id, consolidated):
+                    open_out[move.product_id] |= move
+                    out_picking_by_rec.setdefault(rec, move.picking_id)
+                else:
+                    moves_to_cancel |= move
+
+            for product in set(desired) | set(done_net) | set(open_out) | set(open_ret):
+                rounding = product.uom_id.rounding
+                diff = desired[product] - done_net[product]
+                for want, existing, to_create, label in (
+                    (max(diff, 0.0), open_out[product], new_out, labels.get(product, 'Consumo')),
+                    (max(-diff, 0.0), open_ret[product], new_ret, 'Devolución'),
+                ):
+                    if float_compare(want, 0.0, precision_rounding=rounding) <= 0:
+                        moves_to_cancel |= existing
+                    elif existing:
+                        moves_to_cancel |= existing[1:]
+                        if float_compare(existing[0].product_uom_qty, want, precision_rounding=rounding):
+                            qty_by_move[existing[0]] = want
+                    else:
+                        to_create.append((rec, label, product, want))
+
+        # Los pickings que queden vacíos se eliminan al final: pueden recibir los movimientos nuevos
+        emptied_pickings = moves_to_cancel.picking_id
+        if moves_to_cancel:
+            moves_to_cancel._action_cancel()
+            moves_to_cancel.unlink()
+
+        if not consolidated:
+            self._update_consumption_pickings(out_picking_by_rec)
+
+        updated_moves = Move
+        for move, qty in qty_by_move.items():
+            _logger.info(f'Registro diario {move.broiler_daily_log_id.id}: ajustando {move.product_id.display_name} {move.product_uom_qty} -> {qty}')
+            move._do_unreserve()
+            move.product_uom_qty = qty
+            updated_moves |= move
+
+        new_moves = Move
+        if new_out or new_ret:
+            if not picking_type:
+                _logger.error(f'No se encontró picking type Salida Broiler')
+                raise ValidationError(
+                    "No se encontró el tipo de operación 'Salida Broiler'. "
+                    "Reinstala el módulo broiler_farm."
+                )
+            src = picking_type.default_location_src_id or (logs.company_id or self.env.company)._broiler_get_stock_location()
+            dest = picking_type.default_location_dest_id
+            if not dest:
+                dest = logs[:1].flock_id._get_consumption_location()
+
+            if consolidated:
+                # Un picking por día y ubicación origen, compartido por todos los lotes
+                picking_by_date = self._get_consolidated_pickings(
+                    picking_type, src, dest, {rec.date for rec, *_ in new_out}
+                )
+                out_picking_by_rec = {rec: picking_by_date[rec.date] for rec, *_ in new_out}
+            else:
+                missing = list(dict.fromkeys(rec for rec, *_ in new_out if rec not in out_picking_by_rec))
+                out_picking_by_rec.update(zip(missing, self.env['stock.picking'].create([{
+                    'picking_type_id': picking_type.id,
+                    'location_id': src.id,
+                    'location_dest_id': dest.id,
+                    'origin': 'Consumo %s - %s' % (rec.flock_id.name, rec.date),
+                    'scheduled_date': rec.date,
+                    'broiler_flock_id': rec.flock_id.id,
+                } for rec in missing])))
+
+            missing = list(dict.fromkeys(rec for rec, *_ in new_ret if rec not in ret_picking_by_rec))
+            ret_picking_by_rec.update(zip(missing, self.env['stock.picking'].create([{
+                'picking_type_id': (picking_type.return_picking_type_id or picking_type).id,
+                'location_id': dest.id,
+                'location_dest_id': src.id,
+                'origin': 'Devolución consumo %s - %s' % (rec.flock_id.name, rec.date),
+                'scheduled_date': rec.date,
+                'broiler_flock_id': rec.flock_id.id,
+            } for rec in missing])))
+
+            move_vals_list = []
+            for lines, picking_by_rec, locations in (
+                (new_out, out_picking_by_rec, (src, dest)),
+                (new_ret, ret_picking_by_rec, (dest, src)),
+            ):
+                for rec, label, product, qty in lines:
+                    move_vals_list.append({
+                        'reference': '%s %s' % (label, product.display_name),
+                        'product_id': product.id,
+                        'product_uom_qty': qty,
+                        'product_uom': product.uom_id.id,
+                        'location_id': locations[0].id,
+                        'location_dest_id': locations[1].id,
+                        'picking_id': picking_by_rec[rec].id,
+                        'broiler_daily_log_id': rec.id,
+                        'origin': 'Consumo %s - %s' % (rec.flock_id.name, rec.date),
+                    })
+            new_moves = Move.create(move_vals_list)._action_confirm()
+
+        # Solo se reservan los movimientos nuevos o ajustados (el picking puede ser compartido)
+        (new_moves | updated_moves)._action_assign()
+        emptied_pickings.filtered(lambda p: not p.move_ids).unlink()
+
+    @api.model
+    def _update_consumption_pickings(self, picking_by_rec):
+        """Actualiza la cabecera de los pickings propios del registro si cambió su lote o fecha."""
+        for rec, picking in picking_by_rec.items():
+            vals = {}
+            if picking.broiler_flock_id != rec.flock_id:
+                vals['broiler_flock_id'] = rec.flock_id.id
+            if picking.scheduled_date.date() != rec.date:
+                vals['scheduled_date'] = rec.date
+            if vals:
+                vals['origin'] = 'Consumo %s - %s' % (rec.flock_id.name, rec.date)
+                picking.write(vals)
+
+    @api.model
+    def _get_consolidated_pickings(self, picking_type, src, dest, dates):
+        """Picking abierto de consumo consolidado para cada fecha: {date: picking}.
+
+        Reutiliza el picking del día si aún no está hecho/cancelado y crea de una vez
+        los que falten.
+        """
+        Picking = self.env['stock.picking']
+        picking_by_date = {}
+        for picking in Picking.search([
+            ('picking_type_id', '=', picking_type.id),
+            ('broiler_consolidated', '=', True),
+            ('broiler_consumption_date', 'in', list(dates)),
+            ('location_id', '=', src.id),
+            ('location_dest_id', '=', dest.id),
+            ('state', 'not in', ('done', 'cancel')),
+        ], order='id'):
+            picking_by_date.setdefault(picking.broiler_consumption_date, picking)
+
+        missing = sorted(date for date in dates if date not in picking_by_date)
+        if missing:
+            new_pickings = Picking.create([{
+                'picking_type_id': picking_type.id,
+                'location_id': src.id,
+                'location_dest_id': dest.id,
+                'origin': 'Consumo %s - %s' % (src.display_name, date),
+                'scheduled_date': date,
+                'broiler_consolidated': True,
+                'broiler_consumption_date': date,
+            } for date in missing])
+            picking_by_date.update(zip(missing, new_pickings))
+        return picking_by_date
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -262,14 +427,47 @@ class BroilerDailyLog(models.Model):
             if not vals.get("name"):
                 vals["name"] = self.env['ir.sequence'].next_by_code('broiler.daily.log') or '/'
         records = super().create(vals_list)
+        self.env["broiler.flock"]._apply_log_kpi_changes({}, records._get_kpi_snapshot())
         for rec in records:
             _logger.info(f"DEBUG: BroilerDailyLog.create llamado - ID: {rec.id}, Flock: {rec.flock_id.name if rec.flock_id else 'None'}")
-            rec._sync_stock_consumption_moves()
+        records._sync_or_enqueue_stock()
+        records._get_weighted_flocks()._refresh_forecasts()
+        # Registros de hoy del dashboard (los KPIs los marca el lote al actualizarse)
+        self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(records.company_id.ids, ("flocks",))
         return records
 
+    def _get_weighted_flocks(self):
+        """Lotes de los registros con muestra de peso (los que cambian la proyección)."""
+        return self.filtered(lambda r: r.avg_weight_g > 0).flock_id
+
+    def _sync_or_enqueue_stock(self):
+        """Sincroniza ya, o encola si la empresa usa sincronización en segundo plano."""
+        deferred = self.filtered(lambda r: r.company_id.broiler_deferred_stock_sync)
+        self.env['broiler.stock.sync.queue']._enqueue(deferred)
+        (self - deferred)._sync_stock_consumption_moves()
+
+    def _set_stock_sync_state(self, state, errors=None):
+        """Fija el estado de sincronización de stock por SQL, con ``errors`` {log_id: mensaje}.
+
+        Es contabilidad de la cola y del reproceso: no pasa por write() ni cambia
+        write_date, así que un registro sincronizado no vuelve a salir en la exportación
+        incremental.
+        """
+        if not self:
+            return
+        errors = errors or {}
+        self.flush_recordset(["stock_sync_state", "stock_sync_error"])
+        self.env.cr.execute("""
+            UPDATE broiler_daily_log l
+               SET stock_sync_state = %s, stock_sync_error = d.error
+              FROM (SELECT unnest(%s::int[]) AS id, unnest(%s::text[]) AS error) d
+             WHERE l.id = d.id
+        """, (state, self.ids, [errors.get(log_id) for log_id in self.ids]))
+        self.invalidate_recordset(["stock_sync_state", "stock_sync_error"])
+
     def action_view_pending_pickings(self):
         self.ensure_one()
-        broiler_picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", False)
+        broiler_picking_type = self.company_id._broiler_get_salida_picking_type()
         domain = [("state", "in", ["assigned", "waiting", "confirmed"])]
         if broiler_picking_type:
             domain.append(("picking_type_id", "=", broiler_picking_type.id))
@@ -300,22 +498,182 @@ class BroilerDailyLog(models.Model):
             record.starter_stock_available = starter_stock
             record.finisher_stock_available = finisher_stock
 
+    def _get_kpi_snapshot(self):
+        """Valores de cada registro que afectan a los KPIs del lote."""
+        return {
+            rec.id: {
+                "flock_id": rec.flock_id.id,
+                "date": rec.date,
+                "dead_qty": rec.dead_qty,
+                "culled_qty": rec.culled_qty,
+                "feed_kg": rec.feed_kg,
+                "water_l": rec.water_l,
+                "avg_weight_g": rec.avg_weight_g,
+                "is_last_weight": rec.flock_id.last_weight_log_id == rec,
+            }
+            for rec in self
+        }
+
     def write(self, vals):
+        track_kpis = bool(self._KPI_TRIGGER_FIELDS & set(vals))
+        before = self._get_kpi_snapshot() if track_kpis else {}
+        weight_fields = {'avg_weight_g', 'date', 'flock_id'}
+        weighted_before = self._get_weighted_flocks() if weight_fields & set(vals) else None
+        moved = {'date', 'flock_id'} & set(vals)
+        if moved:
+            self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(self.company_id.ids, ("flocks",))
         res = super().write(vals)
+        if moved:
+            self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(self.company_id.ids, ("flocks",))
+        if track_kpis:
+            self.env["broiler.flock"]._apply_log_kpi_changes(before, self._get_kpi_snapshot())
         feed_fields = {'feed_starter_kg', 'feed_finisher_kg',
-                       'feed_starter_product_tmpl_id', 'feed_finisher_product_tmpl_id'}
+                       'feed_starter_product_tmpl_id', 'feed_finisher_product_tmpl_id',
+                       'date', 'flock_id'}
         if feed_fields & set(vals):
-            for rec in self:
-                rec._sync_stock_consumption_moves()
+            self._sync_or_enqueue_stock()
+        if weighted_before is not None:
+            (weighted_before | self._get_weighted_flocks())._refresh_forecasts()
+        return res
+
+    def unlink(self):
+        before = self._get_kpi_snapshot()
+        weighted = self._get_weighted_flocks()
+        company_ids = self.company_id.ids
+        res = super().unlink()
+        self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(company_ids, ("flocks",))
+        self.env["broiler.flock"]._apply_log_kpi_changes(before, {})
+        weighted.exists()._refresh_forecasts()
         return res
 
     def action_reprocess_stock_moves(self):
-        if not self:
-            self = self.search([])
+        """Re-procesa los registros seleccionados; si no hay selección o es mayor que un
+        bloque, crea un job por bloques con punto de control (broiler.reprocess.job)."""
+        Job = self.env["broiler.reprocess.job"]
+        chunk_size = Job.default_get(["chunk_size"]).get("chunk_size") or 200
+        if not self or len(self) > chunk_size:
+            job = Job.create({
+                "name": "Re-proceso de %s" % ("%s registros" % len(self) if self else "todos los registros"),
+                "log_ids": [(6, 0, self.ids)],
+            })
+            job.action_start()
+            return {
+                "type": "ir.actions.act_window",
+                "res_model": "broiler.reprocess.job",
+                "res_id": job.id,
+                "view_mode": "form",
+            }
         for rec in self:
             _logger.info(f"REPROCESS: Re-procesando registro diario ID {rec.id} - Lote {rec.flock_id.name}")
-            rec._sync_stock_consumption_moves()
+        self._sync_stock_consumption_moves()
         return {
             "type": "ir.actions.client",
             "tag": "reload",
         }
+
+    # -----------------------
+    # IMPORTACIÓN MASIVA
+    # -----------------------
+    _IMPORT_FLOAT_FIELDS = ("feed_starter_kg", "feed_finisher_kg", "water_l", "avg_weight_g")
+    _IMPORT_INT_FIELDS = ("dead_qty", "culled_qty", "sample_size")
+    _IMPORT_TEXT_FIELDS = ("notes", "medication", "vaccine")
+
+    @api.model
+    def import_daily_logs(self, rows):
+        """Carga masiva de registros diarios.
+
+        ``rows`` es una lista de dicts con ``flock`` (nombre del lote) o ``flock_id``,
+        ``date`` y los valores del registro; ``feed_starter_product`` /
+        ``feed_finisher_product`` (código interno o nombre de la plantilla) son opcionales
+        y por defecto se toman del lote. Lotes y productos se resuelven con una consulta
+        cada uno, los registros se crean con un solo ``create`` y los movimientos de stock
+        de todos ellos se generan juntos. Una fila inválida no aborta el lote: se devuelve
+        ``{"created": [ids], "errors": [{"row": n, "error": msg}]}`` (filas desde 1).
+        """
+        errors = []
+
+        flock_refs = {row.get("flock") for row in rows if row.get("flock") and not row.get("flock_id")}
+        flocks_by_name = {}
+        if flock_refs:
+            for flock in self.env["broiler.flock"].search([
+                ("name", "in", list(flock_refs)),
+                ("company_id", "in", self.env.companies.ids),
+            ]):
+                flocks_by_name.setdefault(flock.name, []).append(flock.id)
+        flock_ids = {int(row["flock_id"]) for row in rows if str(row.get("flock_id") or "").isdigit()}
+        known_flocks = self.env["broiler.flock"].browse(flock_ids).exists() if flock_ids else self.env["broiler.flock"]
+        flocks = self.env["broiler.flock"].browse(
+            known_flocks.ids + [ids[0] for ids in flocks_by_name.values()]
+        )
+
+        product_refs = {
+            row.get(key) for row in rows
+            for key in ("feed_starter_product", "feed_finisher_product") if row.get(key)
+        }
+        templates_by_ref = {}
+        if product_refs:
+            for tmpl in self.env["product.template"].search([
+                ("type", "=", "consu"),
+                "|", ("default_code", "in", list(product_refs)), ("name", "in", list(product_refs)),
+            ]):
+                templates_by_ref.setdefault(tmpl.default_code, tmpl.id)
+                templates_by_ref.setdefault(tmpl.name, tmpl.id)
+
+        vals_list = []
+        row_numbers = []
+        for row_number, row in enumerate(rows, start=1):
+            try:
+                if row.get("flock_id"):
+                    flock = flocks.filtered(lambda f: f.id == int(row["flock_id"]))
+                else:
+                    matches = flocks_by_name.get(row.get("flock"), [])
+                    if len(matches) > 1:
+                        raise ValueError("El lote '%s' existe en varias empresas" % row.get("flock"))
+                    flock = flocks.browse(matches)
+                if not flock:
+                    raise ValueError("Lote no encontrado: %s" % (row.get("flock_id") or row.get("flock")))
+                if not row.get("date"):
+                    raise ValueError("Falta la fecha")
+
+                vals = {
+                    "flock_id": flock.id,
+                    "date": fields.Date.to_date(row["date"]),
+                    "feed_starter_product_tmpl_id": flock.feed_starter_product_tmpl_id.id,
+                    "feed_finisher_product_tmpl_id": flock.feed_finisher_product_tmpl_id.id,
+                }
+                for key, fname in (("feed_starter_product", "feed_starter_product_tmpl_id"),
+                                   ("feed_finisher_product", "feed_finisher_product_tmpl_id")):
+                    if row.get(key):
+                        if row[key] not in templates_by_ref:
+                            raise ValueError("Producto no encontrado: %s" % row[key])
+                        vals[fname] = templates_by_ref[row[key]]
+                for fname in self._IMPORT_FLOAT_FIELDS:
+                    vals[fname] = float(row.get(fname) or 0.0)
+                for fname in self._IMPORT_INT_FIELDS:
+                    vals[fname] = int(float(row.get(fname) or 0))
+                for fname in self._IMPORT_TEXT_FIELDS:
+                    if row.get(fname):
+                        vals[fname] = row[fname]
+            except (ValueError, TypeError) as e:
+                errors.append({"row": row_number, "error": str(e)})
+                continue
+            vals_list.append(vals)
+            row_numbers.append(row_number)
+
+        logs = self.browse()
+        if vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    logs = self.create(vals_list)
+            except Exception as e:
+                # Alguna fila viola una restricción: se reintenta fila por fila para aislarla
+                _logger.info("Importación de registros diarios: reintento fila por fila (%s)", e)
+                for row_number, vals in zip(row_numbers, vals_list):
+                    try:
+                        with self.env.cr.savepoint():
+                            logs |= self.create(vals)
+                    except Exception as row_error:
+                        errors.append({"row": row_number, "error": str(row_error)})
+
+        _logger.info("Importación de registros diarios: %s creados, %s con error", len(logs), len(errors))
+        return {"created": logs.ids, "errors": errors}
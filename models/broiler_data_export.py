@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import csv
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_BATCH_SIZE = 5000
+EXPORT_SINCE_PARAM = "broiler_farm.daily_log_export_since.%s"
+# write_date es el inicio de la transacción que escribe: el punto de partida se guarda con
+# este margen antes del inicio de la exportación para no perder transacciones largas
+EXPORT_SINCE_OVERLAP = datetime.timedelta(minutes=15)
+
+# (columna, expresión SQL, tipo pyarrow); el orden es el del archivo
+EXPORT_COLUMNS = [
+    ("log_id", "l.id", "int64"),
+    ("log_ref", "l.name", "string"),
+    ("date", "l.date", "date32"),
+    ("company", "c.name", "string"),
+    ("flock_id", "f.id", "int64"),
+    ("flock", "f.name", "string"),
+    ("farm_name", "f.farm_name", "string"),
+    ("house", "f.house", "string"),
+    ("strain", "f.strain", "string"),
+    ("supplier", "f.supplier", "string"),
+    ("flock_state", "f.state", "string"),
+    ("flock_date_in", "f.date_in", "timestamp"),
+    ("flock_initial_qty", "f.initial_qty", "int64"),
+    ("feed_starter_product", "COALESCE(ts.name->>%(lang)s, ts.name->>'en_US')", "string"),
+    ("feed_starter_kg", "l.feed_starter_kg", "float64"),
+    ("feed_finisher_product", "COALESCE(tf.name->>%(lang)s, tf.name->>'en_US')", "string"),
+    ("feed_finisher_kg", "l.feed_finisher_kg", "float64"),
+    ("feed_kg", "l.feed_kg", "float64"),
+    ("water_l", "l.water_l", "float64"),
+    ("dead_qty", "l.dead_qty", "int64"),
+    ("culled_qty", "l.culled_qty", "int64"),
+    ("avg_weight_g", "l.avg_weight_g", "float64"),
+    ("sample_size", "l.sample_size", "int64"),
+    ("flock_alive_qty", "f.alive_qty", "int64"),
+    ("flock_mortality_pct", "f.mortality_pct", "float64"),
+    ("flock_fcr", "f.fcr", "float64"),
+    ("flock_avg_weight_g", "f.avg_weight_g", "float64"),
+    ("write_date", "l.write_date", "timestamp"),
+]
+
+
+class BroilerDataExport(models.AbstractModel):
+    """Exportación de registros diarios con los datos de su lote, en flujo.
+
+    Los registros se leen con SQL por lotes de ``EXPORT_BATCH_SIZE`` ordenados por id
+    (paginación por clave, sin OFFSET ni caché del ORM) y cada lote se escribe al archivo
+    antes de leer el siguiente, así que la memoria no crece con el tamaño de la exportación.
+    """
+    _name = "broiler.data.export"
+    _description = "Exportación de registros diarios"
+
+    @api.model
+    def _get_since_key(self, company_ids=None, date_from=None, date_to=None, name="default"):
+        """Clave del punto de partida incremental: incluye los filtros, así una exportación
+        de una empresa o período no adelanta el punto de partida de otra."""
+        return "%s:c%s:d%s_%s" % (
+            name,
+            "-".join(str(company_id) for company_id in sorted(company_ids or [])) or "all",
+            date_from or "",
+            date_to or "",
+        )
+
+    @api.model
+    def _get_export_since(self, key):
+        """(desde, {log_id: write_date ya exportado dentro del margen})."""
+        value = self.env["ir.config_parameter"].sudo().get_param(EXPORT_SINCE_PARAM % key)
+        if not value:
+            return None, {}
+        if not value.startswith("{"):
+            # Formato anterior: solo la fecha
+            return fields.Datetime.to_datetime(value), {}
+        state = json.loads(value)
+        return (
+            datetime.datetime.fromisoformat(state["since"]),
+            {int(log_id): write_date for log_id, write_date in state["seen"].items()},
+        )
+
+    @api.model
+    def _set_export_since(self, key, since, seen):
+        self.env["ir.config_parameter"].sudo().set_param(EXPORT_SINCE_PARAM % key, json.dumps({
+            "since": since.isoformat(),
+            "seen": {str(log_id): write_date for log_id, write_date in seen.items()},
+        }))
+
+    @api.model
+    def _iter_daily_log_batches(self, date_from=None, date_to=None, company_ids=None, since=None,
+                                batch_size=EXPORT_BATCH_SIZE):
+        """Genera listas de tuplas en el orden de ``EXPORT_COLUMNS``."""
+        self.env["broiler.daily.log"].flush_model()
+        self.env["broiler.flock"].flush_model()
+        where = ["l.id > %(last_id)s"]
+        params = {"lang": self.env.lang or "en_US", "limit": batch_size, "last_id": 0}
+        if date_from:
+            where.append("l.date >= %(date_from)s")
+            params["date_from"] = date_from
+        if date_to:
+            where.append("l.date <= %(date_to)s")
+            params["date_to"] = date_to
+        if company_ids:
+            where.append("f.company_id IN %(company_ids)s")
+            params["company_ids"] = tuple(company_ids)
+        if since:
+            where.append("l.write_date > %(since)s")
+            params["since"] = since
+        query = """
+            SELECT {columns}
+              FROM broiler_daily_log l
+              JOIN broiler_flock f ON f.id = l.flock_id
+              JOIN res_company c ON c.id = f.company_id
+         LEFT JOIN product_template ts ON ts.id = l.feed_starter_product_tmpl_id
+         LEFT JOIN product_template tf ON tf.id = l.feed_finisher_product_tmpl_id
+             WHERE {where}
+          ORDER BY l.id
+             LIMIT %(limit)s
+        """.format(
+            columns=", ".join(expr for _name, expr, _type in EXPORT_COLUMNS),
+            where=" AND ".join(where),
+        )
+        while True:
+            self.env.cr.execute(query, params)
+            rows = self.env.cr.fetchall()
+            if not rows:
+                return
+            yield rows
+            params["last_id"] = rows[-1][0]
+
+    @api.model
+    def _export_daily_logs(self, path, file_format="csv", date_from=None, date_to=None, company_ids=None,
+                           incremental=False, since_key="default", batch_size=EXPORT_BATCH_SIZE):
+        """Escribe la exportación en ``path``; devuelve la cantidad de filas.
+
+        Con ``incremental`` solo se exportan los registros modificados desde la última
+        exportación con los mismos filtros (y la misma ``since_key``). El nuevo punto de
+        partida es el inicio de esta exportación menos ``EXPORT_SINCE_OVERLAP``; los
+        registros de ese margen ya exportados se recuerdan por ``log_id`` y ``write_date``
+        y no se repiten, salvo que vuelvan a modificarse.
+        """
+        if file_format == "parquet" and pyarrow is None:
+            raise UserError("La exportación a Parquet requiere la librería de Python 'pyarrow'.")
+        key = self._get_since_key(company_ids, date_from, date_to, since_key)
+        since, seen = self._get_export_since(key) if incremental else (None, {})
+        new_since = fields.Datetime.now() - EXPORT_SINCE_OVERLAP
+        if since:
+            new_since = max(new_since, since)
+        new_seen = {}
+        write_date_index = len(EXPORT_COLUMNS) - 1
+
+        def fresh_batches():
+            for rows in self._iter_daily_log_batches(
+                date_from=date_from, date_to=date_to, company_ids=company_ids, since=since, batch_size=batch_size,
+            ):
+                fresh = []
+                for row in rows:
+                    write_date = row[write_date_index] and row[write_date_index].isoformat()
+                    if write_date and row[write_date_index] > new_since:
+                        new_seen[row[0]] = write_date
+                    if seen.get(row[0]) != write_date:
+                        fresh.append(row)
+                if fresh:
+                    yield fresh
+
+        batches = fresh_batches()
+        total = 0
+        if file_format == "parquet":
+            writer = pyarrow.parquet.ParquetWriter(path, self._get_parquet_schema())
+            try:
+                for rows in batches:
+                    writer.write_table(pyarrow.Table.from_arrays(
+                        [pyarrow.array(column, type=field.type) for column, field in zip(zip(*rows), writer.schema)],
+                        schema=writer.schema,
+                    ))
+                    total += len(rows)
+            finally:
+                writer.close()
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow([name for name, _expr, _type in EXPORT_COLUMNS])
+                for rows in batches:
+                    writer.writerows(rows)
+                    total += len(rows)
+        if incremental:
+            # Lo ya recordado que sigue dentro del margen nuevo y no se volvió a leer
+            for log_id, write_date in seen.items():
+                if log_id not in new_seen and datetime.datetime.fromisoformat(write_date) > new_since:
+                    new_seen[log_id] = write_date
+            self._set_export_since(key, new_since, new_seen)
+        _logger.info("Exportación de registros diarios: %s filas en %s (%s)", total, path, file_format)
+        return total
+
+    @api.model
+    def _create_attachment_from_file(self, path, name, mimetype):
+        """Adjunto con el contenido de ``path`` sin cargarlo en memoria.
+
+        Con el almacenamiento en disco (el habitual) el archivo se mueve al filestore y se
+        enlaza al adjunto por SQL: ``ir.attachment.create`` descarta ``store_fname``,
+        ``checksum`` y ``file_size``. El archivo queda marcado para el recolector del
+        filestore, que lo borra si la transacción se revierte. Con almacenamiento en base
+        de datos no hay forma de evitar leerlo y se crea con ``raw``.
+        """
+        Attachment = self.env["ir.attachment"].sudo()
+        if Attachment._storage() != "file":
+            with open(path, "rb") as f:
+                return Attachment.create({"name": name, "raw": f.read(), "mimetype": mimetype})
+        sha = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        checksum = sha.hexdigest()
+        store_fname = "%s/%s" % (checksum[:2], checksum)
+        full_path = Attachment._full_path(store_fname)
+        file_size = os.path.getsize(path)
+        if not os.path.isfile(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            shutil.move(path, full_path)
+        Attachment._mark_for_gc(store_fname)
+        attachment = Attachment.create({"name": name, "type": "binary", "mimetype": mimetype})
+        attachment.flush_recordset()
+        self.env.cr.execute("""
+            UPDATE ir_attachment
+               SET store_fname = %s, checksum = %s, file_size = %s, db_datas = NULL
+             WHERE id = %s
+        """, (store_fname, checksum, file_size, attachment.id))
+        attachment.invalidate_recordset()
+        return attachment
+
+    @api.model
+    def _get_parquet_schema(self):
+        types = {
+            "int64": pyarrow.int64(),
+            "float64": pyarrow.float64(),
+            "string": pyarrow.string(),
+            "date32": pyarrow.date32(),
+            "timestamp": pyarrow.timestamp("us"),
+        }
+        return pyarrow.schema([(name, types[type_]) for name, _expr, type_ in EXPORT_COLUMNS])
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
-import json
 from odoo import api, fields, models
 
+from .broiler_perf_stat import broiler_perf
+
+# Filas que se envían en cada lista embebida; el resto se ve con "Ver todos"
+DASHBOARD_LIST_LIMIT = 20
+
 
 class BroilerFarmDashboard(models.Model):
     _name = "broiler.farm.dashboard"
@@ -32,36 +36,53 @@ class BroilerFarmDashboard(models.Model):
     pending_pickings_ids = fields.Many2many(
         "stock.picking",
         string="Pickings Pendientes por Confirmar",
-        compute="_compute_kpis"
+        compute="_compute_data_lists"
     )
 
     # today's logs
     today_logs_count = fields.Integer(string="Registros de Hoy", compute="_compute_kpis")
 
     # Graph data
-    flocks_graph = fields.Text(string="Gráfico Lotes", compute="_compute_graphs")
-    pickings_graph = fields.Text(string="Gráfico Pickings", compute="_compute_graphs")
-    weight_graph = fields.Text(string="Gráfico Pesos", compute="_compute_graphs")
-
-    # Data for embedded views
-    flock_ids = fields.Many2many("broiler.flock", string="Lotes", compute="_compute_data_lists")
-    picking_ids = fields.Many2many("stock.picking", string="Pickings", compute="_compute_data_lists")
+    flocks_graph = fields.Text(string="Gráfico Lotes", compute="_compute_kpis")
+    pickings_graph = fields.Text(string="Gráfico Pickings", compute="_compute_kpis")
+    weight_graph = fields.Text(string="Gráfico Pesos", compute="_compute_kpis")
+
+    # Data for embedded views (acotadas a DASHBOARD_LIST_LIMIT filas)
+    flock_ids = fields.Many2many("broiler.flock", string="Lotes activos", compute="_compute_data_lists")
+    picking_ids = fields.Many2many("stock.picking", string="Pickings pendientes", compute="_compute_data_lists")
+    flock_list_count = fields.Integer(string="Lotes activos (total)", compute="_compute_data_lists")
+    picking_list_count = fields.Integer(string="Pickings pendientes (total)", compute="_compute_data_lists")
+
+    def _get_active_flocks_domain(self):
+        return [("company_id", "=", self.env.company.id), ("state", "=", "active")]
+
+    def _get_pending_pickings_domain(self):
+        snapshot_model = self.env["broiler.farm.dashboard.snapshot"]
+        return [
+            ("company_id", "=", self.env.company.id),
+            ("state", "in", ["assigned", "waiting", "confirmed"]),
+        ] + snapshot_model._get_broiler_picking_domain()
 
     @api.depends("last_update")
+    @broiler_perf
     def _compute_data_lists(self):
+        # Solo las primeras filas con los filtros por defecto; los totales con search_count
+        flock_model = self.env["broiler.flock"]
+        picking_model = self.env["stock.picking"]
+        flock_domain = self._get_active_flocks_domain()
+        picking_domain = self._get_pending_pickings_domain()
+        flocks = flock_model.search(flock_domain, order="date_in desc, id desc", limit=DASHBOARD_LIST_LIMIT)
+        pickings = picking_model.search(picking_domain, order="scheduled_date, id", limit=DASHBOARD_LIST_LIMIT)
+        flock_count = flock_model.search_count(flock_domain) if len(flocks) == DASHBOARD_LIST_LIMIT else len(flocks)
+        picking_count = (
+            picking_model.search_count(picking_domain) if len(pickings) == DASHBOARD_LIST_LIMIT else len(pickings)
+        )
         for rec in self:
-            flock_model = self.env["broiler.flock"]
-            picking_model = self.env["stock.picking"]
-            broiler_picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", False)
-            
-            all_flocks = flock_model.search([])
-            domain = []
-            if broiler_picking_type:
-                domain.append(("picking_type_id", "=", broiler_picking_type.id))
-            all_pickings = picking_model.search(domain)
-            
-            rec.flock_ids = [(6, 0, all_flocks.ids)]
-            rec.picking_ids = [(6, 0, all_pickings.ids)]
+            rec.flock_ids = flocks
+            rec.picking_ids = pickings
+            rec.pending_pickings_ids = pickings
+            rec.flock_list_count = flock_count
+            rec.picking_list_count = picking_count
 
     @api.depends("last_update")
     def _compute_display_name(self):
@@ -71,116 +92,57 @@ class BroilerFarmDashboard(models.Model):
         self.last_update = fields.Datetime.now()
 
     def action_refresh(self):
+        self.env["broiler.farm.dashboard.snapshot"]._refresh_companies(self.env.company)
         self.last_update = fields.Datetime.now()
         return {
             "type": "ir.actions.act_view_reload",
         }
 
+    @api.model
+    def _cron_refresh_snapshots(self):
+        # Solo las secciones marcadas por cambios; sin cambios es una sola consulta
+        self.env["broiler.farm.dashboard.snapshot"]._refresh_dirty()
+
     @api.depends("last_update")
+    @broiler_perf
     def _compute_kpis(self):
+        # Una sola lectura del resumen persistido de la empresa actual, para KPIs y
+        # gráficos (comparten este compute y se calculan juntos)
+        snapshot = self.env["broiler.farm.dashboard.snapshot"]._get_snapshot()
         for rec in self:
-            flock_model = self.env["broiler.flock"]
-            all_flocks = flock_model.search([])
-            active_flocks = all_flocks.filtered(lambda f: f.state == "active")
-            closed_flocks = all_flocks.filtered(lambda f: f.state == "closed")
-            draft_flocks = all_flocks.filtered(lambda f: f.state == "draft")
-
-            rec.total_flocks = len(all_flocks)
-            rec.active_flocks = len(active_flocks)
-            rec.closed_flocks = len(closed_flocks)
-            rec.draft_flocks = len(draft_flocks)
-
-            rec.total_birds = sum(all_flocks.mapped("initial_qty") or [0])
-            rec.alive_birds = sum(all_flocks.mapped("alive_qty") or [0])
-            rec.dead_birds = sum(all_flocks.mapped("dead_qty") or [0])
-
-            rec.total_cost = sum(all_flocks.mapped("total_cost") or [0])
-            rec.total_feed_cost = sum(all_flocks.mapped("cost_feed") or [0])
-
-            weights = active_flocks.mapped("avg_weight_g")
-            rec.avg_weight_g = sum(weights) / len(weights) if weights else 0.0
-
-            fcrs = active_flocks.mapped("fcr")
-            rec.avg_fcr = sum(fcrs) / len(fcrs) if fcrs else 0.0
-
-            # Pickings filtrados por broiler (tiene broiler_flock_id o tipo de picking de salida broiler)
-            picking_model = self.env["stock.picking"]
-            broiler_picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", False)
-            
-            domain = [
-                ("state", "in", ["assigned", "waiting", "confirmed"]),
-            ]
-            if broiler_picking_type:
-                domain.append(("picking_type_id", "=", broiler_picking_type.id))
-            
-            pending_pickings = picking_model.search(domain)
-            rec.pending_pickings_count = len(pending_pickings)
-            rec.pending_pickings_ids = [(6, 0, pending_pickings.ids)]
-
-            today = fields.Date.today()
-            log_model = self.env["broiler.daily.log"]
-            rec.today_logs_count = log_model.search_count([("date", "=", today)])
+            rec.total_flocks = snapshot.total_flocks
+            rec.active_flocks = snapshot.active_flocks
+            rec.closed_flocks = snapshot.closed_flocks
+            rec.draft_flocks = snapshot.draft_flocks
 
-    @api.depends("last_update")
-    def _compute_graphs(self):
-        for rec in self:
-            flock_model = self.env["broiler.flock"]
-            picking_model = self.env["stock.picking"]
-            broiler_picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", False)
-            
-            all_flocks = flock_model.search([])
-            all_pickings = picking_model.search([]) if broiler_picking_type else picking_model
-            
-            rec.flock_ids = [(6, 0, all_flocks.ids)]
-            rec.picking_ids = [(6, 0, all_pickings.ids)]
-
-            # Gráfico de lotes por estado
-            active = len(all_flocks.filtered(lambda f: f.state == "active"))
-            closed = len(all_flocks.filtered(lambda f: f.state == "closed"))
-            draft = len(all_flocks.filtered(lambda f: f.state == "draft"))
-            
-            flocks_data = [{
-                'key': 'Lotes',
-                'values': [
-                    {'label': 'Activos', 'value': active or 0, 'type': 'past'},
-                    {'label': 'Cerrados', 'value': closed or 0, 'type': 'present'},
-                    {'label': 'Borrador', 'value': draft or 0, 'type': 'future'},
-                ]
-            }]
-            rec.flocks_graph = json.dumps(flocks_data)
-
-            # Gráfico de pickings por estado
-            pending = len(all_pickings.filtered(lambda p: p.state in ["assigned", "waiting", "confirmed"]))
-            done = len(all_pickings.filtered(lambda p: p.state == "done"))
-            cancel = len(all_pickings.filtered(lambda p: p.state == "cancel"))
-            
-            pickings_data = [{
-                'key': 'Pickings',
-                'values': [
-                    {'label': 'Pendientes', 'value': pending or 0, 'type': 'past'},
-                    {'label': 'Completados', 'value': done or 0, 'type': 'present'},
-                    {'label': 'Cancelados', 'value': cancel or 0, 'type': 'future'},
-                ]
-            }]
-            rec.pickings_graph = json.dumps(pickings_data)
-
-            # Gráfico de pesos promedios por lote
-            weights = []
-            for flock in all_flocks:
-                if flock.avg_weight_g:
-                    weights.append({'label': flock.name, 'value': flock.avg_weight_g / 1000})
-            
-            weight_data = [{
-                'key': 'Peso (kg)',
-                'values': weights
-            }]
-            rec.weight_graph = json.dumps(weight_data)
+            rec.total_birds = snapshot.total_birds
+            rec.alive_birds = snapshot.alive_birds
+            rec.dead_birds = snapshot.dead_birds
+
+            rec.total_cost = snapshot.total_cost
+            rec.total_feed_cost = snapshot.total_feed_cost
+
+            rec.avg_weight_g = snapshot.avg_weight_g
+            rec.avg_fcr = snapshot.avg_fcr
+
+            rec.pending_pickings_count = snapshot.pending_pickings_count
+            rec.today_logs_count = snapshot.today_logs_count
+
+            rec.flocks_graph = snapshot.flocks_graph
+            rec.pickings_graph = snapshot.pickings_graph
+            rec.weight_graph = snapshot.weight_graph
+
+    def action_view_active_flocks(self):
+        return {
+            "name": "Lotes activos",
+            "type": "ir.actions.act_window",
+            "res_model": "broiler.flock",
+            "view_mode": "list,form",
+            "domain": self._get_active_flocks_domain(),
+        }
 
     def action_view_pending_pickings(self):
-        broiler_picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", False)
-        domain = [("state", "in", ["assigned", "waiting", "confirmed"])]
-        if broiler_picking_type:
-            domain.append(("picking_type_id", "=", broiler_picking_type.id))
+        domain = self._get_pending_pickings_domain()
         return {
             "name": "Pickings Pendientes",
             "type": "ir.actions.act_window",
@@ -192,18 +154,5 @@ class BroilerFarmDashboard(models.Model):
 
     @api.model
     def get_dashboard_data(self):
-        self.ensure_one()
-        return {
-            "total_flocks": self.total_flocks,
-            "active_flocks": self.active_flocks,
-            "closed_flocks": self.closed_flocks,
-            "draft_flocks": self.draft_flocks,
-            "alive_birds": self.alive_birds,
-            "dead_birds": self.dead_birds,
-            "total_cost": self.total_cost,
-            "total_feed_cost": self.total_feed_cost,
-            "avg_weight_g": self.avg_weight_g,
-            "avg_fcr": self.avg_fcr,
-            "pending_pickings_count": self.pending_pickings_count,
-            "today_logs_count": self.today_logs_count,
-        }
+        """KPIs y series de gráficos de la empresa actual, desde su resumen persistido."""
+        return self.env["broiler.farm.dashboard.snapshot"]._get_snapshot()._get_dashboard_payload()
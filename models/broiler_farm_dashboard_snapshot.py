@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+
+from odoo import api, fields, models
+
+from .broiler_perf_stat import broiler_perf
+
+_logger = logging.getLogger(__name__)
+
+PENDING_PICKING_STATES = ("assigned", "waiting", "confirmed")
+# Secciones del resumen que se recalculan por separado (columna dirty_gen_<sección>)
+SNAPSHOT_SECTIONS = ("flocks", "pickings", "weights")
+
+
+class BroilerFarmDashboardSnapshot(models.Model):
+    _name = "broiler.farm.dashboard.snapshot"
+    _description = "Resumen persistido del Dashboard Granja"
+    _rec_name = "company_id"
+
+    company_id = fields.Many2one("res.company", string="Empresa", required=True, ondelete="cascade", index=True)
+    date_computed = fields.Datetime(string="Calculado el", readonly=True)
+
+    total_flocks = fields.Integer(string="Total Lotes")
+    active_flocks = fields.Integer(string="Lotes Activos")
+    closed_flocks = fields.Integer(string="Lotes Cerrados")
+    draft_flocks = fields.Integer(string="Lotes en Borrador")
+
+    total_birds = fields.Integer(string="Total Aves")
+    alive_birds = fields.Integer(string="Aves Vivas")
+    dead_birds = fields.Integer(string="Mortalidad Total")
+
+    total_cost = fields.Float(string="Costo Total Operativo", digits=(16, 2))
+    total_feed_cost = fields.Float(string="Costo Alimento", digits=(16, 2))
+
+    avg_weight_g = fields.Float(string="Peso Promedio (g)", digits=(16, 2))
+    avg_fcr = fields.Float(string="FCR Promedio", digits=(16, 3))
+
+    pending_pickings_count = fields.Integer(string="Pickings Pendientes")
+    today_logs_date = fields.Date(string="Fecha local de los registros de hoy")
+    today_logs_count = fields.Integer(string="Registros de Hoy")
+
+    # JSON ya serializado para los widgets de gráfico
+    flocks_graph = fields.Text(string="Gráfico Lotes")
+    pickings_graph = fields.Text(string="Gráfico Pickings")
+    weight_graph = fields.Text(string="Gráfico Pesos")
+
+    # Cambios pendientes de recalcular por sección (ver _mark_dirty); 0 = al día
+    dirty_gen_flocks = fields.Integer(string="Cambios pendientes en lotes", default=1, readonly=True)
+    dirty_gen_pickings = fields.Integer(string="Cambios pendientes en pickings", default=1, readonly=True)
+    dirty_gen_weights = fields.Integer(string="Cambios pendientes en pesos", default=1, readonly=True)
+
+    _sql_constraints = [
+        ("uniq_dashboard_snapshot_company", "unique(company_id)", "Ya existe un resumen para esta empresa.")
+    ]
+
+    @api.model
+    def _get_snapshot(self, company=None):
+        """Resumen de la empresa al día (recalcula las secciones marcadas o lo construye)."""
+        company = company or self.env.company
+        self._refresh_dirty([company.id])
+        snapshot = self.sudo().search([("company_id", "=", company.id)], limit=1)
+        if not snapshot:
+            snapshot = self._refresh_companies(company)
+        return snapshot
+
+    def _get_dashboard_payload(self):
+        """Datos del resumen listos para JSON (KPIs y series de los gráficos)."""
+        self.ensure_one()
+        return {
+            "company_id": self.company_id.id,
+            "date_computed": fields.Datetime.to_string(self.date_computed),
+            "total_flocks": self.total_flocks,
+            "active_flocks": self.active_flocks,
+            "closed_flocks": self.closed_flocks,
+            "draft_flocks": self.draft_flocks,
+            "total_birds": self.total_birds,
+            "alive_birds": self.alive_birds,
+            "dead_birds": self.dead_birds,
+            "total_cost": self.total_cost,
+            "total_feed_cost": self.total_feed_cost,
+            "avg_weight_g": self.avg_weight_g,
+            "avg_fcr": self.avg_fcr,
+            "pending_pickings_count": self.pending_pickings_count,
+            "today_logs_count": self.today_logs_count,
+            "graphs": {
+                "flocks": json.loads(self.flocks_graph or "[]"),
+                "pickings": json.loads(self.pickings_graph or "[]"),
+                "weight": json.loads(self.weight_graph or "[]"),
+            },
+        }
+
+    @api.model
+    def _get_broiler_picking_domain(self, companies=None):
+        companies = companies or self.env.company
+        picking_type_ids = [
+            type_id for type_id in map(companies._broiler_salida_picking_type_id, companies.ids) if type_id
+        ]
+        if picking_type_ids:
+            return [("picking_type_id", "in", picking_type_ids)]
+        return [("picking_type_id.sequence_code", "=", "SB")]
+
+    # -------------------------
+    # Invalidación por cambios
+    # -------------------------
+    @api.model
+    def _mark_dirty(self, company_ids, sections):
+        """Marca como desactualizadas las secciones de los resúmenes de esas empresas.
+
+        Cada marca incrementa el contador de la sección, también si ya estaba pendiente:
+        un recálculo concurrente solo lo pone a cero si sigue en el valor que leyó (ver
+        _refresh_sections), así que un cambio que no alcanzó a ver no se pierde.
+        """
+        company_ids = tuple({company_id for company_id in company_ids if company_id})
+        if not company_ids or not sections:
+            return
+        columns = ["dirty_gen_%s" % section for section in SNAPSHOT_SECTIONS if section in sections]
+        self.flush_model(columns)
+        self.env.cr.execute("""
+            UPDATE broiler_farm_dashboard_snapshot
+               SET {sets}
+             WHERE company_id IN %s
+        """.format(
+            sets=", ".join("{0} = {0} + 1".format(column) for column in columns),
+        ), [company_ids])
+        if self.env.cr.rowcount:
+            self.invalidate_model(columns)
+
+    @api.model
+    def _get_dirty_sections(self, company_ids=None):
+        """{company_id: {secciones}} a recalcular, con una sola consulta a los resúmenes.
+
+        Además de las marcadas, la sección de lotes se recalcula cuando cambia el día
+        local de la empresa (registros de hoy).
+        """
+        query = "SELECT company_id, dirty_gen_flocks, dirty_gen_pickings, dirty_gen_weights, today_logs_date " \
+                "FROM broiler_farm_dashboard_snapshot"
+        params = []
+        self.flush_model(["dirty_gen_%s" % section for section in SNAPSHOT_SECTIONS] + ["today_logs_date"])
+        if company_ids is not None:
+            query += " WHERE company_id IN %s"
+            params.append(tuple(company_ids) or (0,))
+        self.env.cr.execute(query, params)
+        rows = self.env.cr.fetchall()
+        companies = self.env["res.company"].sudo().browse([row[0] for row in rows])
+        result = {}
+        for (company_id, *generations, logs_date), company in zip(rows, companies):
+            sections = {section for section, generation in zip(SNAPSHOT_SECTIONS, generations) if generation}
+            if logs_date != company._broiler_local_today():
+                sections.add("flocks")
+            if sections:
+                result[company_id] = sections
+        return result
+
+    @api.model
+    def _refresh_dirty(self, company_ids=None):
+        """Recalcula solo las secciones marcadas; sin cambios cuesta una consulta."""
+        dirty = self._get_dirty_sections(company_ids)
+        if dirty:
+            self._refresh_sections(dirty)
+        return dirty
+
+    # -------------------------
+    # Recálculo
+    # -------------------------
+    @api.model
+    def _refresh_companies(self, companies=None):
+        """Recalcula todas las secciones de los resúmenes de esas empresas (o de todas)."""
+        companies = (companies or self.env["res.company"].search([])).sudo()
+        if not companies:
+            return self.browse()
+        return self._refresh_sections({company.id: set(SNAPSHOT_SECTIONS) for company in companies})
+
+    @api.model
+    @broiler_perf
+    def _refresh_sections(self, sections_by_company):
+        """Recalcula las secciones pedidas ``{company_id: {secciones}}`` con unas pocas
+        consultas agregadas, cada una solo para las empresas que la necesitan.
+
+        Los contadores de cambios se leen antes de recalcular y al final solo se ponen a
+        cero los que siguen igual: una marca posterior deja la sección pendiente.
+        """
+        Flock = self.env["broiler.flock"].sudo()
+        snapshots = self.sudo().search([("company_id", "in", list(sections_by_company))])
+        generation_columns = ["dirty_gen_%s" % section for section in SNAPSHOT_SECTIONS]
+        generations = {}
+        if snapshots:
+            self.flush_model(generation_columns)
+            self.env.cr.execute("""
+                SELECT id, {columns}
+                  FROM broiler_farm_dashboard_snapshot
+                 WHERE id IN %s
+            """.format(columns=", ".join(generation_columns)), [tuple(snapshots.ids)])
+            generations = {row[0]: dict(zip(SNAPSHOT_SECTIONS, row[1:])) for row in self.env.cr.fetchall()}
+        # Un resumen nuevo necesita todas las secciones
+        sections_by_company = dict(sections_by_company)
+        for company_id in set(sections_by_company) - set(snapshots.company_id.ids):
+            sections_by_company[company_id] = set(SNAPSHOT_SECTIONS)
+        companies = self.env["res.company"].sudo().browse(list(sections_by_company))
+        by_section = {
+            section: companies.filtered(lambda c: section in sections_by_company[c.id])
+            for section in SNAPSHOT_SECTIONS
+        }
+        now = fields.Datetime.now()
+        values = {company.id: {"date_computed": now} for company in companies}
+
+        flock_companies = by_section["flocks"]
+        for company in flock_companies:
+            values[company.id].update({
+                "total_flocks": 0, "active_flocks": 0, "closed_flocks": 0, "draft_flocks": 0,
+                "total_birds": 0, "alive_birds": 0, "dead_birds": 0,
+                "total_cost": 0.0, "total_feed_cost": 0.0,
+                "avg_weight_g": 0.0, "avg_fcr": 0.0,
+                "today_logs_date": company._broiler_local_today(),
+                "today_logs_count": 0,
+                            })
+        if flock_companies:
+            # Lotes por empresa y estado
+            flock_groups = Flock._read_group(
+                [("company_id", "in", flock_companies.ids)],
+                ["company_id", "state"],
+                ["__count", "initial_qty:sum", "alive_qty:sum", "dead_qty:sum", "avg_weight_g:avg", "fcr:avg"],
+            )
+            for company, state, count, initial, alive, dead, weight, fcr in flock_groups:
+                vals = values[company.id]
+                vals["total_flocks"] += count
+                if state in ("active", "closed", "draft"):
+                    vals[f"{state}_flocks"] = count
+                vals["total_birds"] += initial or 0
+                vals["alive_birds"] += alive or 0
+                vals["dead_birds"] += dead or 0
+                if state == "active":
+                    vals["avg_weight_g"] = weight or 0.0
+                    vals["avg_fcr"] = fcr or 0.0
+
+            # Costos por empresa y tipo, desde el libro de costos de los lotes
+            cost_groups = self.env["broiler.flock.cost.line"].sudo()._read_group(
+                [("company_id", "in", flock_companies.ids)],
+                ["company_id", "cost_type"],
+                ["amount:sum"],
+            )
+            for company, cost_type, amount in cost_groups:
+                values[company.id]["total_cost"] += amount or 0.0
+                if cost_type == "feed":
+                    values[company.id]["total_feed_cost"] += amount or 0.0
+
+            # Registros del día (fecha local de cada empresa)
+            log_groups = self.env["broiler.daily.log"].sudo()._read_group(
+                [
+                    ("company_id", "in", flock_companies.ids),
+                    ("date", "in", list({values[c.id]["today_logs_date"] for c in flock_companies})),
+                ],
+                ["company_id", "date:day"],
+                ["__count"],
+            )
+            for company, day, count in log_groups:
+                if values[company.id]["today_logs_date"] == day:
+                    values[company.id]["today_logs_count"] = count
+
+            for company in flock_companies:
+                vals = values[company.id]
+                vals["flocks_graph"] = json.dumps([{
+                    "key": "Lotes",
+                    "values": [
+                        {"label": "Activos", "value": vals["active_flocks"], "type": "past"},
+                        {"label": "Cerrados", "value": vals["closed_flocks"], "type": "present"},
+                        {"label": "Borrador", "value": vals["draft_flocks"], "type": "future"},
+                    ]
+                }])
+
+        picking_companies = by_section["pickings"]
+        if picking_companies:
+            # Pickings de Salida Broiler por empresa y estado
+            picking_counts = {company.id: dict.fromkeys(("pending", "done", "cancel"), 0) for company in picking_companies}
+            picking_groups = self.env["stock.picking"].sudo()._read_group(
+                [("company_id", "in", picking_companies.ids)] + self._get_broiler_picking_domain(picking_companies),
+                ["company_id", "state"],
+                ["__count"],
+            )
+            for company, state, count in picking_groups:
+                if state in PENDING_PICKING_STATES:
+                    picking_counts[company.id]["pending"] += count
+                elif state in ("done", "cancel"):
+                    picking_counts[company.id][state] += count
+            for company in picking_companies:
+                counts = picking_counts[company.id]
+                values[company.id].update({
+                    "pending_pickings_count": counts["pending"],
+                    "pickings_graph": json.dumps([{
+                        "key": "Pickings",
+                        "values": [
+                            {"label": "Pendientes", "value": counts["pending"], "type": "past"},
+                            {"label": "Completados", "value": counts["done"], "type": "present"},
+                            {"label": "Cancelados", "value": counts["cancel"], "type": "future"},
+                        ]
+                    }]),
+                                    })
+
+        weight_companies = by_section["weights"]
+        if weight_companies:
+            # Peso promedio por lote
+            weights = {company.id: [] for company in weight_companies}
+            for row in Flock.search_read(
+                [("company_id", "in", weight_companies.ids), ("avg_weight_g", "!=", 0)],
+                ["company_id", "name", "avg_weight_g"],
+                order="id",
+            ):
+                weights[row["company_id"][0]].append({"label": row["name"], "value": row["avg_weight_g"] / 1000})
+            for company in weight_companies:
+                values[company.id].update({
+                    "weight_graph": json.dumps([{
+                        "key": "Peso (kg)",
+                        "values": weights[company.id],
+                    }]),
+                                    })
+
+        for snapshot in snapshots:
+            snapshot.write(values.pop(snapshot.company_id.id))
+        if generations:
+            self.flush_model()
+            for snapshot in snapshots:
+                for section in sections_by_company[snapshot.company_id.id]:
+                    self.env.cr.execute("""
+                        UPDATE broiler_farm_dashboard_snapshot
+                           SET {column} = 0
+                         WHERE id = %s AND {column} = %s
+                    """.format(column="dirty_gen_%s" % section), [snapshot.id, generations[snapshot.id][section]])
+            snapshots.invalidate_recordset(generation_columns)
+        if values:
+            snapshots |= self.sudo().create([
+                dict(vals, company_id=company_id, **dict.fromkeys(generation_columns, 0))
+                for company_id, vals in values.items()
+            ])
+        _logger.info("Dashboard broiler recalculado: %s", {
+            section: len(section_companies) for section, section_companies in by_section.items()
+        })
+        return snapshots
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
 
@@ -85,6 +87,12 @@ class BroilerFeedConsumption(models.Model):
         readonly=True
     )
     
+    raw_move_id = fields.Many2one(
+        'stock.move',
+        string='Movimiento de Materia Prima',
+        readonly=True
+    )
+    
     picking_id = fields.Many2one(
         'stock.picking',
         string='Transferencia',
@@ -113,102 +121,164 @@ class BroilerFeedConsumption(models.Model):
             if record.qty <= 0:
                 raise ValidationError('La cantidad debe ser mayor que 0')
     
-    def action_confirm(self):
-        """Confirmar el consumo y generar movimiento de producción"""
+    # -------------------------
+    # Órdenes de producción consolidadas
+    # -------------------------
+    def _get_production_group_key(self, group_by='lot_date'):
+        """Clave de agrupación: una OP por lote y fecha, o por ubicación origen y fecha."""
         self.ensure_one()
-        if self.state != 'draft':
-            return
-            
-        # Obtener ubicación del lote (ubicación interna donde está el stock)
-        lot_location = self.lot_id.location_id
-        if not lot_location:
-            lot_location = self.env.ref('stock.stock_location_stock')
-        
-        # Buscar ubicación virtual de producción (consumo productivo)
-        production_location = self.env['stock.location'].search([
-            ('usage', '=', 'production'),
-            ('company_id', '=', self.company_id.id)
-        ], limit=1)
-        
-        if not production_location:
-            # Crear ubicación virtual de producción si no existe
-            production_location = self.env['stock.location'].create({
+        if group_by == 'location':
+            return (self.company_id.id, self._get_source_location().id, False, self.date)
+        return (self.company_id.id, self._get_source_location().id, self.lot_id.id, self.date)
+
+    def _get_source_location(self):
+        """Ubicación del lote (donde está el stock)."""
+        self.ensure_one()
+        return self.lot_id.location_id or self.company_id._broiler_get_stock_location()
+
+    @api.model
+    def _get_production_location_by_company(self, companies):
+        """Ubicación virtual de producción de cada empresa: una búsqueda para todas."""
+        StockLoc = self.env['stock.location'].sudo()
+        location_by_company = {}
+        for location in StockLoc.search([('usage', '=', 'production'), ('company_id', 'in', companies.ids)]):
+            location_by_company.setdefault(location.company_id.id, location)
+        missing = companies.filtered(lambda c: c.id not in location_by_company)
+        if missing:
+            created = StockLoc.create([{
                 'name': 'Consumo Producción Avícola',
                 'usage': 'production',
-                'company_id': self.company_id.id,
-                'location_id': self.env.ref('stock.stock_location_stock').id,
+                'company_id': company.id,
+                'location_id': company._broiler_get_stock_location().id,
+            } for company in missing])
+            location_by_company.update(zip(missing.ids, created))
+        return location_by_company
+
+    @api.model
+    def _get_consumption_product(self):
+        """Producto terminado de las OPs de consumo (no almacenable y sin costo)."""
+        return self.env.ref('broiler_farm.product_broiler_feed_consumption')
+
+    def _create_grouped_productions(self, group_by='lot_date'):
+        """Crea y confirma una OP por grupo con un movimiento de materia prima por consumo.
+
+        Una OP agrupa consumos de varios productos y lotes, así que su producto terminado
+        no puede ser el de ninguno de ellos: todas producen una unidad del producto no
+        almacenable ``product_broiler_feed_consumption``, que no genera valoración, y el
+        costo queda solo en los movimientos de materia prima.
+
+        OPs y movimientos se crean con un create cada uno; la confirmación y la reserva se
+        hacen sobre el conjunto de OPs.
+        """
+        groups = defaultdict(lambda: self.browse())
+        for record in self:
+            groups[record._get_production_group_key(group_by)] |= record
+        production_location_by_company = self._get_production_location_by_company(self.company_id)
+
+        consumption_product = self._get_consumption_product()
+        production_vals = []
+        for (company_id, src_location_id, lot_id, date), records in groups.items():
+            lots = records.lot_id
+            production_vals.append({
+                'product_id': consumption_product.id,
+                'product_qty': 1.0,
+                'product_uom_id': consumption_product.uom_id.id,
+                'location_src_id': src_location_id,  # Desde donde sale el stock
+                'location_dest_id': production_location_by_company[company_id].id,  # Consumo virtual
+                'origin': 'Lote: %s' % ', '.join(lots.mapped('name')),
+                'broiler_flock_id': lot_id or (lots.id if len(lots) == 1 else False),
+                'date_start': date,
+                'user_id': self.env.user.id,
+                'company_id': company_id,
             })
-        
-        # Crear orden de producción para consumo de materia prima
-        production_vals = {
-            'name': f'Consumo: {self.display_name}',
-            'product_id': self.product_id.id,
-            'product_qty': self.qty,
-            'product_uom_id': self.product_uom_id.id,
-            'location_src_id': lot_location.id,  # Desde donde sale el stock
-            'location_dest_id': production_location.id,  # Hacia consumo virtual
-            'origin': f'Lote: {self.lot_id.name}',
-            'date_planned_start': self.date,
-            'date_planned_finished': self.date,
-            'user_id': self.env.user.id,
-            'company_id': self.company_id.id,
-            'state': 'confirmed',
-        }
-        
-        production = self.env['mrp.production'].create(production_vals)
-        
-        # Confirmar producción para reservar stock
-        production.action_confirm()
-        
-        # Marcar el consumo como confirmado
-        self.write({
-            'state': 'confirmed',
-            'production_id': production.id
-        })
-        
-        return {
+        productions = self.env['mrp.production'].create(production_vals)
+
+        move_vals = []
+        ordered_records = self.browse()
+        for production, records in zip(productions, groups.values()):
+            for record in records:
+                move_vals.append(production._get_move_raw_values(record.product_id, record.qty, record.product_uom_id))
+                ordered_records |= record
+        raw_moves = self.env['stock.move'].create(move_vals)
+
+        productions.action_confirm()
+        productions.action_assign()
+        for production, records in zip(productions, groups.values()):
+            records.write({'production_id': production.id})
+        # Un movimiento distinto por consumo: una sola actualización para todos
+        self.flush_model(['raw_move_id'])
+        self.env.cr.execute("""
+            UPDATE broiler_feed_consumption c
+               SET raw_move_id = v.move_id
+              FROM unnest(%s, %s) AS v(id, move_id)
+             WHERE c.id = v.id
+        """, (ordered_records.ids, raw_moves.ids))
+        ordered_records.invalidate_recordset(['raw_move_id'])
+        return productions
+
+    def action_confirm(self, group_by='lot_date'):
+        """Confirmar los consumos agrupándolos en órdenes de producción"""
+        records = self.filtered(lambda r: r.state == 'draft')
+        if not records:
+            return False
+        productions = records._create_grouped_productions(group_by)
+        records.write({'state': 'confirmed'})
+
+        action = {
             'type': 'ir.actions.act_window',
-            'name': 'Orden de Producción',
-            'view_mode': 'form',
+            'name': 'Órdenes de Producción',
             'res_model': 'mrp.production',
-            'res_id': production.id,
             'target': 'current',
         }
-    
+        if len(productions) == 1:
+            action.update({'view_mode': 'form', 'res_id': productions.id})
+        else:
+            action.update({'view_mode': 'list,form', 'domain': [('id', 'in', productions.ids)]})
+        return action
+
+    def action_confirm_by_location(self):
+        """Confirmar agrupando por ubicación origen y fecha (varios lotes por OP)"""
+        return self.action_confirm(group_by='location')
+
     def action_mark_done(self):
         """Marcar como realizado y generar consumos finales"""
-        self.ensure_one()
-        if self.state != 'confirmed':
-            return
-            
-        if not self.production_id:
+        records = self.filtered(lambda r: r.state == 'confirmed')
+        if not records:
+            return False
+        if any(not record.production_id for record in records):
             raise ValidationError('No hay orden de producción asociada')
-        
-        # Marcar producción como hecha
-        self.production_id.button_mark_done()
-        
-        # Actualizar estado
-        self.write({'state': 'done'})
-        
+
+        productions = records.production_id.filtered(lambda p: p.state not in ('done', 'cancel'))
+        # Se consume lo registrado aunque la reserva no esté completa
+        for move in productions.move_raw_ids.filtered(lambda m: m.state not in ('done', 'cancel')):
+            move.quantity = move.product_uom_qty
+        productions.move_raw_ids.picked = True
+        res = productions.with_context(skip_consumption=True, skip_backorder=True).button_mark_done()
+        if isinstance(res, dict):
+            return res
+
+        records.write({'state': 'done'})
         return True
-    
+
     def action_cancel(self):
         """Cancelar el consumo"""
-        self.ensure_one()
-        
-        if self.production_id and self.production_id.state not in ('done', 'cancel'):
-            self.production_id.action_cancel()
-        
-        self.write({'state': 'cancel'})
+        records = self.filtered(lambda r: r.state not in ('done', 'cancel'))
+        records.raw_move_id.filtered(lambda m: m.state not in ('done', 'cancel'))._action_cancel()
+        records.write({'state': 'cancel'})
+        # La OP se cancela cuando ya no le queda ningún consumo activo
+        productions = records.production_id.filtered(lambda p: p.state not in ('done', 'cancel'))
+        active = self.search([('production_id', 'in', productions.ids), ('state', '!=', 'cancel')])
+        (productions - active.production_id).action_cancel()
         return True
-    
+
     @api.model_create_multi
     def create(self, vals_list):
         records = super().create(vals_list)
+        # Crear automáticamente una entrada en el registro diario del lote (un solo create)
+        log_vals_list = []
         for record in records:
-            # Crear automáticamente una entrada en el registro diario del lote
             if record.lot_id and record.state in ('done', 'confirmed'):
-                self.env['broiler.daily.log'].create({
+                log_vals_list.append({
                     'flock_id': record.lot_id.id,
                     'date': record.date,
                     'feed_starter_product_tmpl_id': record.product_tmpl_id.id if record.product_tmpl_id else False,
@@ -217,4 +287,6 @@ class BroilerFeedConsumption(models.Model):
                     'feed_finisher_kg': record.qty if 'FINAL' in record.product_id.name.upper() else 0.0,
                     'notes': f'Consumo registrado desde módulo de consumo: {record.qty}kg',
                 })
-        return records
\ No newline at end of file
+        if log_vals_list:
+            self.env['broiler.daily.log'].create(log_vals_list)
+        return records
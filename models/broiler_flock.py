@@ -1,8 +1,36 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+import logging
+
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
 import re
 
+from .broiler_perf_stat import broiler_perf
+
+_logger = logging.getLogger(__name__)
+
+# Campo del registro diario -> acumulado del lote que se mantiene por deltas
+LOG_KPI_DELTA_FIELDS = {
+    "dead_qty": "dead_qty",
+    "culled_qty": "culled_qty",
+    "feed_kg": "feed_total_kg",
+    "water_l": "water_total_l",
+}
+
+# Campos del lote que usa el resumen del dashboard, por sección
+DASHBOARD_FLOCK_FIELDS = {
+    "company_id", "state", "initial_qty", "initial_weight_g", "dead_qty", "culled_qty",
+    "feed_total_kg", "avg_weight_g",
+}
+DASHBOARD_WEIGHT_FIELDS = {"company_id", "name", "avg_weight_g"}
+
+# Por encima de este número de lotes el Reporte de Lote se genera en segundo plano
+REPORT_BACKGROUND_THRESHOLD = 20
+
+# Parte de fecha de los nombres automáticos (LOTE_DDMMAAAA-NNNN o el antiguo LOTE_DDMMAAAAHHMMSS)
+LOTE_NAME_RE = re.compile(r"^LOTE_\d{8}")
+
 
 class BroilerFlock(models.Model):
     _name = "broiler.flock"
@@ -12,11 +40,15 @@ class BroilerFlock(models.Model):
 
     company_id = fields.Many2one('res.company', string='Empresa', required=True, default=lambda self: self.env.company)
 
-    # Nombre automático: LOTE_DDMMAAAA(-NNN)
+    # Nombre automático: LOTE_DDMMAAAA-NNNN (secuencia broiler.flock de la empresa)
     name = fields.Char(string="Lote", required=True, tracking=True, readonly=True, default="/")
 
     date_in = fields.Datetime(string="Fecha y Hora de Ingreso", required=True, tracking=True)
     initial_qty = fields.Integer(string="Cantidad Inicial", required=True, tracking=True)
+    initial_weight_g = fields.Float(
+        string="Peso del pollito (g)", digits=(16, 2), default=40.0, tracking=True,
+        help="Peso promedio al ingreso; base de la ganancia de peso y del FCR",
+    )
 
     farm_name = fields.Char(string="Granja")
     house = fields.Char(string="Galpón")
@@ -70,21 +102,42 @@ class BroilerFlock(models.Model):
     # Ubicación por lote (opcional, recomendado)
     location_id = fields.Many2one("stock.location", string="Ubicación del lote", readonly=True)
 
-    # Costeo operativo (sin contabilidad)
-    total_cost = fields.Float(string="Costo Operativo Acumulado", digits=(16, 2), default=0.0)
-    cost_feed = fields.Float(string="Costo Alimento", digits=(16, 2), default=0.0)
-    cost_other = fields.Float(string="Otros Costos Manuales", digits=(16, 2), default=0.0)
+    # Costeo operativo (sin contabilidad): totales del libro broiler.flock.cost.line
+    cost_line_ids = fields.One2many("broiler.flock.cost.line", "flock_id", string="Costos", readonly=True)
+    total_cost = fields.Float(string="Costo Operativo Acumulado", digits=(16, 2), compute="_compute_costs")
+    cost_feed = fields.Float(string="Costo Alimento", digits=(16, 2), compute="_compute_costs")
+    cost_other = fields.Float(string="Otros Costos Manuales", digits=(16, 2), compute="_compute_costs")
 
     # KPIs
-    age_days = fields.Integer(string="Edad (días)", compute="_compute_kpis", store=True)
-    dead_qty = fields.Integer(string="Mortalidad acumulada", compute="_compute_kpis", store=True)
-    culled_qty = fields.Integer(string="Descartes acumulados", compute="_compute_kpis", store=True)
+    # Acumulados mantenidos por deltas desde broiler.daily.log (ver _apply_log_kpi_changes)
+    dead_qty = fields.Integer(string="Mortalidad acumulada", readonly=True, default=0)
+    culled_qty = fields.Integer(string="Descartes acumulados", readonly=True, default=0)
+    feed_total_kg = fields.Float(string="Alimento acumulado (kg)", readonly=True, default=0.0, digits=(16, 3))
+    water_total_l = fields.Float(string="Agua acumulada (L)", readonly=True, default=0.0, digits=(16, 2))
+    avg_weight_g = fields.Float(string="Peso promedio (g)", readonly=True, default=0.0, digits=(16, 2))
+    last_weight_log_id = fields.Many2one(
+        "broiler.daily.log", string="Último registro pesado", readonly=True, ondelete="set null",
+    )
+
+    # Se fija al crear, al cambiar la fecha de ingreso o el estado (un lote en borrador que se
+    # activa días después); el cron diario la avanza en los activos (_cron_rollover_age_days)
+    age_days = fields.Integer(string="Edad (días)", compute="_compute_age_days", store=True)
+
+    # Proyección de cosecha (curva de Gompertz, ver broiler.growth.engine._compute_forecasts).
+    # Se recalcula solo cuando cambia una muestra de peso o el peso objetivo
+    target_weight_g = fields.Float(string="Peso objetivo cosecha (g)", digits=(16, 2), default=2500.0, tracking=True)
+    forecast_sample_count = fields.Integer(string="Muestras de peso", readonly=True)
+    forecast_asymptote_g = fields.Float(string="Peso asintótico (g)", readonly=True, digits=(16, 1))
+    forecast_b = fields.Float(string="Gompertz b", readonly=True, digits=(16, 4))
+    forecast_k = fields.Float(string="Gompertz k", readonly=True, digits=(16, 4))
+    forecast_harvest_age = fields.Float(string="Edad de cosecha estimada (días)", readonly=True, digits=(16, 1))
+    forecast_harvest_date = fields.Date(string="Fecha de cosecha estimada", readonly=True, index=True)
+    forecast_alive_qty = fields.Integer(string="Aves a cosecha (est.)", readonly=True)
+    forecast_live_kg = fields.Float(string="Kg vivos a cosecha (est.)", readonly=True, digits=(16, 1))
+
+    # Derivados de los acumulados (O(1) por lote)
     alive_qty = fields.Integer(string="Aves vivas", compute="_compute_kpis", store=True)
     mortality_pct = fields.Float(string="% Bajas", compute="_compute_kpis", store=True, digits=(16, 2))
-
-    feed_total_kg = fields.Float(string="Alimento acumulado (kg)", compute="_compute_kpis", store=True, digits=(16, 3))
-    water_total_l = fields.Float(string="Agua acumulada (L)", compute="_compute_kpis", store=True, digits=(16, 2))
-    avg_weight_g = fields.Float(string="Peso promedio (g)", compute="_compute_kpis", store=True, digits=(16, 2))
     fcr = fields.Float(string="FCR (estimado)", compute="_compute_kpis", store=True, digits=(16, 3))
 
     _sql_constraints = [
@@ -101,77 +154,107 @@ class BroilerFlock(models.Model):
     # Ubicaciones
     # -------------------------
     def _get_broiler_parent_location(self):
-        StockLoc = self.env["stock.location"]
-        stock_loc = self.env.ref("stock.stock_location_stock")
-        parent = StockLoc.search([("name", "=", "Broiler"), ("location_id", "=", stock_loc.id)], limit=1)
-        if not parent:
-            parent = StockLoc.create({
-                "name": "Broiler",
-                "usage": "internal",
-                "location_id": stock_loc.id,
-            })
-        return parent
+        return (self[:1].company_id or self.env.company)._broiler_get_parent_location()
 
     def _get_consumption_location(self):
-        StockLoc = self.env["stock.location"]
-        parent = self._get_broiler_parent_location()
-        cons = StockLoc.search([("name", "=", "Consumo"), ("location_id", "=", parent.id)], limit=1)
-        if not cons:
-            cons = StockLoc.create({
-                "name": "Consumo",
-                "usage": "production",
-                "location_id": parent.id,
-            })
-        return cons
+        return (self[:1].company_id or self.env.company)._broiler_get_consumption_location()
 
     @api.model_create_multi
     def create(self, vals_list):
-        # Generar nombre
+        companies = self.env["res.company"]
         for vals in vals_list:
-            date_in = vals.get("date_in") or fields.Datetime.now()
-            date_in = fields.Datetime.to_datetime(date_in)
-            company_id = vals.get("company_id") or self.env.company.id
-
+            date_in = fields.Datetime.to_datetime(vals.get("date_in") or fields.Datetime.now())
+            company = companies.browse(vals.get("company_id") or self.env.company.id)
             if not vals.get("name") or vals.get("name") == "/":
-                vals["name"] = self._make_lote_name(date_in, company_id)
+                vals["name"] = self._next_lote_name(date_in, company)
+            companies |= company
 
-        records = super().create(vals_list)
-
-        # Crear ubicación por lote (tipo Produccion)
-        for flock in records:
-            if not flock.location_id and flock.name and flock.name.startswith("LOTE"):
-                parent = flock._get_broiler_parent_location()
-                loc = self.env["stock.location"].create({
-                    "name": f"{flock.name}",
+        # Ubicación por lote (tipo Producción): todas en un solo create, antes de los lotes
+        parent_by_company = {company.id: company._broiler_get_parent_location() for company in companies}
+        loc_vals_list = []
+        pending_vals = []
+        for vals in vals_list:
+            if not vals.get("location_id") and vals["name"].startswith("LOTE"):
+                company_id = vals.get("company_id") or self.env.company.id
+                loc_vals_list.append({
+                    "name": vals["name"],
                     "usage": "production",
-                    "location_id": parent.id,
+                    "location_id": parent_by_company[company_id].id,
+                    "company_id": company_id,
                 })
-                flock.location_id = loc.id
+                pending_vals.append(vals)
+        if loc_vals_list:
+            locations = self.env["stock.location"].sudo().create(loc_vals_list)
+            for vals, location in zip(pending_vals, locations):
+                vals["location_id"] = location.id
 
-        return records
+        flocks = super().create(vals_list)
+        self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(flocks.company_id.ids, ("flocks", "weights"))
+        return flocks
 
     def write(self, vals):
-        # Si cambian date_in en borrador, re-nombrar
+        dashboard_sections = self._get_dashboard_sections(vals)
+        if dashboard_sections and "company_id" in vals:
+            self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(self.company_id.ids, dashboard_sections)
+        # Si cambia date_in en borrador, se cambia la fecha del nombre conservando su número
         if "date_in" in vals:
             new_date = fields.Datetime.to_datetime(vals["date_in"])
-            for rec in self:
-                if rec.state == "draft" and rec.name and rec.name.startswith("LOTE_"):
-                    vals2 = dict(vals)
-                    vals2["name"] = rec._make_lote_name(new_date)
-                    super(BroilerFlock, rec).write(vals2)
-            return True
-        return super().write(vals)
-
-    def _make_lote_name(self, date_in, company_id=None):
-        if company_id is None:
-            company_id = self.company_id.id if self.company_id else self.env.company.id
-        ddmmyyyy = date_in.strftime("%d%m%Y")
-        now = fields.Datetime.now().strftime("%H%M%S")
-        return f"LOTE_{ddmmyyyy}{now}"
+            to_rename = self.filtered(lambda r: r.state == "draft" and r.name and LOTE_NAME_RE.match(r.name))
+            res = super(BroilerFlock, self - to_rename).write(vals)
+            for rec in to_rename:
+                new_name = LOTE_NAME_RE.sub(rec._lote_date_prefix(new_date), rec.name)
+                super(BroilerFlock, rec).write(dict(vals, name=new_name))
+                if rec.location_id.name == rec.name:
+                    rec.location_id.sudo().name = new_name
+        else:
+            res = super().write(vals)
+        if {"target_weight_g", "initial_weight_g", "date_in"} & set(vals):
+            self._refresh_forecasts()
+        if dashboard_sections:
+            self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(self.company_id.ids, dashboard_sections)
+        return res
+
+    def unlink(self):
+        company_ids = self.company_id.ids
+        res = super().unlink()
+        self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(company_ids, ("flocks", "weights"))
+        return res
+
+    @api.model
+    def _get_dashboard_sections(self, vals):
+        """Secciones del dashboard que cambian con estos valores."""
+        sections = set()
+        if DASHBOARD_FLOCK_FIELDS & set(vals):
+            sections.add("flocks")
+        if DASHBOARD_WEIGHT_FIELDS & set(vals):
+            sections.add("weights")
+        return sections
+
+    @api.model
+    def _lote_date_prefix(self, date_in, company=None):
+        company = company or self.company_id or self.env.company
+        return "LOTE_%s" % company._broiler_local_date(date_in).strftime("%d%m%Y")
+
+    @api.model
+    def _next_lote_name(self, date_in, company):
+        """LOTE_DDMMAAAA-NNNN con la secuencia broiler.flock de la empresa.
+
+        La secuencia es de implementación estándar (secuencia PostgreSQL): la asignación no
+        bloquea filas y dos workers nunca reciben el mismo número. No usa rangos por fecha,
+        así que la fecha del prefijo se pasa con ``ir_sequence_date`` (``sequence_date``
+        solo aplica a los rangos y sin ellos se usaría la fecha de hoy).
+        """
+        local_date = company._broiler_local_date(date_in)
+        name = self.env["ir.sequence"].with_company(company).with_context(
+            ir_sequence_date=fields.Date.to_string(local_date),
+        ).next_by_code("broiler.flock")
+        if not name:
+            raise ValidationError("No se encontró la secuencia de lotes (broiler.flock).")
+        return name
 
     def action_view_pending_pickings(self):
         self.ensure_one()
-        broiler_picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", False)
+        broiler_picking_type = (self.company_id or self.env.company)._broiler_get_salida_picking_type()
         domain = [("state", "in", ["assigned", "waiting", "confirmed"])]
         if broiler_picking_type:
             domain.append(("picking_type_id", "=", broiler_picking_type.id))
@@ -187,43 +270,187 @@ class BroilerFlock(models.Model):
     # -------------------------
     # KPIs
     # -------------------------
-    @api.depends(
-        "date_in", "initial_qty",
-        "daily_log_ids.date",
-        "daily_log_ids.dead_qty",
-        "daily_log_ids.culled_qty",
-        "daily_log_ids.feed_kg",
-        "daily_log_ids.water_l",
-        "daily_log_ids.avg_weight_g",
-    )
-    def _compute_kpis(self):
+    @api.depends("date_in", "company_id", "state")
+    def _compute_age_days(self):
         for flock in self:
             if flock.date_in:
-                today = fields.Datetime.now()
-                flock.age_days = max((today - flock.date_in).days, 0)
+                company = flock.company_id or self.env.company
+                age = company._broiler_local_today() - company._broiler_local_date(flock.date_in)
+                flock.age_days = max(age.days, 0)
             else:
                 flock.age_days = 0
 
-            dead = sum(flock.daily_log_ids.mapped("dead_qty"))
-            culled = sum(flock.daily_log_ids.mapped("culled_qty"))
-            total_out = dead + culled
-
-            flock.dead_qty = dead
-            flock.culled_qty = culled
+    @api.model
+    def _cron_rollover_age_days(self):
+        """Avanza la edad de los lotes activos al cambiar el día local de cada empresa.
+
+        Un solo UPDATE para todas las empresas pendientes; el resto de KPIs no se toca.
+        Las empresas que ya pasaron el día (broiler_age_rollover_date) se omiten, así
+        que repetir el cron el mismo día no cuesta nada.
+        """
+        companies = self.env["res.company"].sudo().search([])
+        today_by_company = {
+            company: company._broiler_local_today() for company in companies
+        }
+        pending = [
+            company for company, today in today_by_company.items()
+            if company.broiler_age_rollover_date != today
+        ]
+        if not pending:
+            return
+
+        self.flush_model(["date_in", "state", "company_id", "age_days"])
+        self.env.cr.execute("""
+            WITH company_day AS (
+                SELECT unnest(%s::int[]) AS company_id,
+                       unnest(%s::date[]) AS today,
+                       unnest(%s::varchar[]) AS tz
+            ), new_age AS (
+                SELECT f.id,
+                       GREATEST(c.today - (f.date_in AT TIME ZONE 'UTC' AT TIME ZONE c.tz)::date, 0) AS age
+                FROM broiler_flock f
+                JOIN company_day c ON c.company_id = f.company_id
+                WHERE f.state = 'active' AND f.date_in IS NOT NULL
+            )
+            UPDATE broiler_flock f
+               SET age_days = new_age.age
+              FROM new_age
+             WHERE f.id = new_age.id
+               AND f.age_days IS DISTINCT FROM new_age.age
+        """, (
+            [company.id for company in pending],
+            [today_by_company[company] for company in pending],
+            [company._broiler_tz().zone for company in pending],
+        ))
+        _logger.info("Edad de lotes actualizada: %s lotes en %s empresas", self.env.cr.rowcount, len(pending))
+        self.invalidate_model(["age_days"])
+
+        for company in pending:
+            company.broiler_age_rollover_date = today_by_company[company]
+
+    @api.depends("initial_qty", "initial_weight_g", "dead_qty", "culled_qty", "feed_total_kg", "avg_weight_g")
+    @broiler_perf
+    def _compute_kpis(self):
+        for flock in self:
+            total_out = flock.dead_qty + flock.culled_qty
             flock.alive_qty = max((flock.initial_qty or 0) - total_out, 0)
             flock.mortality_pct = (total_out / flock.initial_qty * 100.0) if flock.initial_qty else 0.0
 
-            flock.feed_total_kg = sum(flock.daily_log_ids.mapped("feed_kg"))
-            flock.water_total_l = sum(flock.daily_log_ids.mapped("water_l"))
-
-            last_with_weight = flock.daily_log_ids.filtered(lambda x: x.avg_weight_g and x.avg_weight_g > 0).sorted("date")
-            flock.avg_weight_g = last_with_weight[-1].avg_weight_g if last_with_weight else 0.0
-
-            initial_weight_g = 40.0
-            gain_per_bird_kg = max((flock.avg_weight_g - initial_weight_g) / 1000.0, 0.0)
+            gain_per_bird_kg = max((flock.avg_weight_g - flock.initial_weight_g) / 1000.0, 0.0)
             total_gain_kg = gain_per_bird_kg * flock.alive_qty
             flock.fcr = (flock.feed_total_kg / total_gain_kg) if total_gain_kg > 0 else 0.0
 
+    def _get_log_kpi_totals(self):
+        """Totales de los registros diarios de todos los lotes en una sola consulta agrupada.
+
+        Devuelve {flock_id: {dead_qty, culled_qty, feed_total_kg, water_total_l,
+        avg_weight_g, last_weight_log_id}}. El peso es el del último registro pesado por
+        fecha; ante empate de fecha gana el de menor id.
+        """
+        if not self.ids:
+            return {}
+        self.env["broiler.daily.log"].flush_model([
+            "flock_id", "dead_qty", "culled_qty", "feed_kg", "water_l", "avg_weight_g", "date",
+        ])
+        self.env.cr.execute("""
+            SELECT flock_id,
+                   COALESCE(SUM(dead_qty), 0),
+                   COALESCE(SUM(culled_qty), 0),
+                   COALESCE(SUM(feed_kg), 0.0),
+                   COALESCE(SUM(water_l), 0.0),
+                   (ARRAY_AGG(avg_weight_g ORDER BY date DESC, id ASC)
+                        FILTER (WHERE avg_weight_g > 0))[1],
+                   (ARRAY_AGG(id ORDER BY date DESC, id ASC)
+                        FILTER (WHERE avg_weight_g > 0))[1]
+            FROM broiler_daily_log
+            WHERE flock_id IN %s
+            GROUP BY flock_id
+        """, (tuple(self.ids),))
+        return {
+            flock_id: {
+                "dead_qty": dead,
+                "culled_qty": culled,
+                "feed_total_kg": feed,
+                "water_total_l": water,
+                "avg_weight_g": weight or 0.0,
+                "last_weight_log_id": weight_log_id or False,
+            }
+            for flock_id, dead, culled, feed, water, weight, weight_log_id in self.env.cr.fetchall()
+        }
+
+    def _get_last_weight_values(self):
+        """Último registro pesado de cada lote (DISTINCT ON, una consulta)."""
+        if not self.ids:
+            return {}
+        self.env["broiler.daily.log"].flush_model(["flock_id", "avg_weight_g", "date"])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (flock_id) flock_id, id, avg_weight_g
+            FROM broiler_daily_log
+            WHERE flock_id IN %s AND avg_weight_g > 0
+            ORDER BY flock_id, date DESC, id ASC
+        """, (tuple(self.ids),))
+        return {
+            flock_id: {"last_weight_log_id": log_id, "avg_weight_g": weight}
+            for flock_id, log_id, weight in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _apply_log_kpi_changes(self, before, after):
+        """Aplica a los lotes solo la diferencia entre el estado anterior y posterior
+        de los registros diarios tocados (ver ``broiler.daily.log._get_kpi_snapshot``).
+
+        Un registro creado no tiene entrada en ``before`` y uno eliminado no la tiene en
+        ``after``. El peso promedio solo se vuelve a leer si el registro era el último
+        pesado del lote o pasa a serlo.
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(LOG_KPI_DELTA_FIELDS.values(), 0))
+        for sign, snapshot in ((-1, before), (1, after)):
+            for vals in snapshot.values():
+                if not vals["flock_id"]:
+                    continue
+                flock_delta = deltas[vals["flock_id"]]
+                for log_field, flock_field in LOG_KPI_DELTA_FIELDS.items():
+                    flock_delta[flock_field] += sign * (vals[log_field] or 0)
+
+        weight_flock_ids = set()
+        for log_id in set(before) | set(after):
+            old = before.get(log_id)
+            new = after.get(log_id)
+            if old and old["is_last_weight"] and old != new:
+                weight_flock_ids.add(old["flock_id"])
+            if new and new["flock_id"] and new["avg_weight_g"] > 0:
+                last = self.browse(new["flock_id"]).last_weight_log_id
+                if not last or (new["date"], -log_id) >= (last.date, -last.id):
+                    weight_flock_ids.add(new["flock_id"])
+
+        weights = self.browse(weight_flock_ids)._get_last_weight_values()
+        no_weight = {"avg_weight_g": 0.0, "last_weight_log_id": False}
+        for flock in self.browse(set(deltas) | weight_flock_ids):
+            vals = {
+                fname: flock[fname] + delta
+                for fname, delta in deltas.get(flock.id, {}).items()
+                if delta
+            }
+            if flock.id in weight_flock_ids:
+                vals.update(weights.get(flock.id, no_weight))
+            if vals:
+                flock.write(vals)
+
+    def _rebuild_kpis(self):
+        """Reconstrucción completa de los acumulados (reparar desvíos de los deltas)."""
+        totals = self._get_log_kpi_totals()
+        empty = {
+            "dead_qty": 0, "culled_qty": 0, "feed_total_kg": 0.0, "water_total_l": 0.0,
+            "avg_weight_g": 0.0, "last_weight_log_id": False,
+        }
+        for flock in self:
+            flock.write(totals.get(flock.id, empty))
+
+    def action_rebuild_kpis(self):
+        flocks = self or self.search([])
+        flocks._rebuild_kpis()
+        return True
+
     # -------------------------
     # Botones
     # -------------------------
@@ -233,43 +460,105 @@ class BroilerFlock(models.Model):
     def action_set_closed(self):
         self.write({"state": "closed"})
     
+    # -------------------------
+    # Proyección de cosecha
+    # -------------------------
+    def _refresh_forecasts(self):
+        """Reajusta la curva de crecimiento de los lotes activos (todos en una pasada)."""
+        flocks = self.filtered(lambda f: f.state != "closed")
+        if not flocks:
+            return
+        values = self.env["broiler.growth.engine"]._compute_forecasts(flocks)
+        for flock in flocks:
+            if flock.id in values:
+                super(BroilerFlock, flock).write(values[flock.id])
+
+    def action_print_flock_report(self):
+        """Reporte de Lote: directo para pocos lotes, en segundo plano para selecciones grandes."""
+        if len(self) <= REPORT_BACKGROUND_THRESHOLD:
+            return self.env.ref("broiler_farm.action_report_broiler_flock").report_action(self)
+        self.env["broiler.report.job"]._enqueue(self)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Reporte en preparación",
+                "message": "Se está generando el reporte de %s lotes; recibirá el PDF en una notificación." % len(self),
+                "type": "info",
+                "sticky": False,
+            },
+        }
+
+    def action_refresh_forecasts(self):
+        (self or self.search([("state", "=", "active")]))._refresh_forecasts()
+        return True
+
+    @api.depends("cost_line_ids.amount", "cost_line_ids.cost_type")
+    def _compute_costs(self):
+        totals = self.env["broiler.flock.cost.line"]._get_totals_by_flock(self)
+        for flock in self:
+            by_type = totals.get(flock.id, {})
+            flock.cost_feed = by_type.get("feed", 0.0)
+            flock.total_cost = sum(by_type.values())
+            flock.cost_other = flock.total_cost - flock.cost_feed
+
     @api.depends('feed_starter_product_tmpl_id', 'feed_finisher_product_tmpl_id')
+    @broiler_perf
     def _compute_stock_available(self):
         """Calcular stock disponible de los productos de alimento"""
+        # Una sola consulta agrupada para todos los lotes: cada producto se suma una vez
+        templates = self.feed_starter_product_tmpl_id | self.feed_finisher_product_tmpl_id
+        qty_by_tmpl = self._get_feed_stock_by_template(templates)
         for flock in self:
-            starter_qty = 0.0
-            finisher_qty = 0.0
-            
-            # Stock disponible del alimento inicio
-            if flock.feed_starter_product_tmpl_id:
-                starter_variant = self.env['product.product'].search([
-                    ('product_tmpl_id', '=', flock.feed_starter_product_tmpl_id.id)
-                ], limit=1)
-                if starter_variant:
-                    # Buscar stock en todas las ubicaciones internas
-                    quants = self.env['stock.quant'].search([
-                        ('product_id', '=', starter_variant.id),
-                        ('location_id.usage', '=', 'internal'),
-                        ('quantity', '>', 0)
-                    ])
-                    starter_qty = sum(quants.mapped('quantity'))
-            
-            # Stock disponible del alimento final
-            if flock.feed_finisher_product_tmpl_id:
-                finisher_variant = self.env['product.product'].search([
-                    ('product_tmpl_id', '=', flock.feed_finisher_product_tmpl_id.id)
-                ], limit=1)
-                if finisher_variant:
-                    quants = self.env['stock.quant'].search([
-                        ('product_id', '=', finisher_variant.id),
-                        ('location_id.usage', '=', 'internal'),
-                        ('quantity', '>', 0)
-                    ])
-                    finisher_qty = sum(quants.mapped('quantity'))
-            
-            flock.starter_stock_available = starter_qty
-            flock.finisher_stock_available = finisher_qty
-    
+            flock.starter_stock_available = qty_by_tmpl.get(flock.feed_starter_product_tmpl_id.id, 0.0)
+            flock.finisher_stock_available = qty_by_tmpl.get(flock.feed_finisher_product_tmpl_id.id, 0.0)
+
+    @api.model
+    def _get_feed_stock_by_template(self, templates):
+        """Stock en ubicaciones internas de cada plantilla: {tmpl_id: qty}.
+
+        Si una plantilla tiene varias variantes se suma el stock de todas.
+        """
+        if not templates:
+            return {}
+        variants_by_tmpl = self.env['product.product']._broiler_get_variants_by_template(templates)
+        all_variants = self.env['product.product'].concat(*variants_by_tmpl.values())
+        qty_by_product = {
+            product.id: qty
+            for product, qty in self.env['stock.quant']._read_group(
+                [
+                    ('product_id', 'in', all_variants.ids),
+                    ('location_id.usage', '=', 'internal'),
+                    ('quantity', '>', 0),
+                ],
+                ['product_id'],
+                ['quantity:sum'],
+            )
+        }
+        return {
+            tmpl_id: sum(qty_by_product.get(product_id, 0.0) for product_id in variants.ids)
+            for tmpl_id, variants in variants_by_tmpl.items()
+        }
+
+    @api.model
+    def _invalidate_stock_available(self, templates):
+        """Marca para recalcular el stock de los lotes no cerrados que usan esas plantillas.
+
+        Los campos almacenados hacen de caché por producto: solo se recalculan cuando se
+        realiza un movimiento de alguno de sus productos (ver stock.move._action_done).
+        """
+        if not templates:
+            return
+        flocks = self.search([
+            ('state', '!=', 'closed'),
+            '|',
+            ('feed_starter_product_tmpl_id', 'in', templates.ids),
+            ('feed_finisher_product_tmpl_id', 'in', templates.ids),
+        ])
+        if flocks:
+            self.env.add_to_compute(self._fields['starter_stock_available'], flocks)
+            self.env.add_to_compute(self._fields['finisher_stock_available'], flocks)
+
     def action_update_other_costs(self):
         """Wizard para actualizar otros costos manualmente"""
         return {
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+
+COST_TYPES = [
+    ("feed", "Alimento"),
+    ("medicine", "Medicina"),
+    ("vaccine", "Vacuna"),
+    ("labor", "Mano de Obra"),
+    ("electricity", "Electricidad"),
+    ("water", "Agua"),
+    ("other", "Otro"),
+]
+
+
+class BroilerFlockCostLine(models.Model):
+    """Libro de costos del lote: solo se insertan líneas.
+
+    Los totales del lote se calculan con una suma agrupada sobre este libro, así que
+    dos pickings validados a la vez para el mismo lote nunca compiten por su fila.
+    Una corrección se registra con una línea de importe contrario.
+    """
+    _name = "broiler.flock.cost.line"
+    _description = "Línea de costo del lote"
+    _order = "date desc, id desc"
+
+    flock_id = fields.Many2one("broiler.flock", string="Lote", required=True, ondelete="cascade", index=True)
+    company_id = fields.Many2one(related="flock_id.company_id", store=True, index=True)
+    date = fields.Date(string="Fecha", required=True, default=fields.Date.context_today, index=True)
+    cost_type = fields.Selection(COST_TYPES, string="Tipo de Costo", required=True, index=True)
+    amount = fields.Float(string="Monto", required=True, digits=(16, 2))
+    description = fields.Char(string="Descripción")
+    picking_id = fields.Many2one("stock.picking", string="Transferencia", ondelete="set null", index=True)
+    move_id = fields.Many2one("stock.move", string="Movimiento", ondelete="set null", index="btree_not_null")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(lines.company_id.ids, ("flocks",))
+        return lines
+
+    def write(self, vals):
+        raise UserError("Las líneas de costo no se modifican; registre una línea de corrección.")
+
+    def unlink(self):
+        raise UserError("Las líneas de costo no se eliminan; registre una línea de corrección.")
+
+    @api.model
+    def _get_totals_by_flock(self, flocks):
+        """{flock_id: {cost_type: monto}} con una sola consulta agrupada."""
+        totals = {flock_id: {} for flock_id in flocks.ids}
+        if not totals:
+            return totals
+        for flock, cost_type, amount in self.sudo()._read_group(
+            [("flock_id", "in", flocks.ids)],
+            ["flock_id", "cost_type"],
+            ["amount:sum"],
+        ):
+            totals[flock.id][cost_type] = amount or 0.0
+        return totals
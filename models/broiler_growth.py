@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""Motor de curvas de crecimiento por lote (vectorizado con NumPy).
+
+Los registros diarios de muchos lotes se cargan como arreglos columnares ordenados por
+(lote, día) y todas las series se calculan en una sola pasada, sin bucles por lote.
+"""
+import numpy as np
+
+from odoo import api, fields, models
+
+# Series por registro diario que produce compute_growth_series
+GROWTH_SERIES = (
+    "age_day", "alive_qty", "weight_g", "adg_g", "feed_per_bird_g", "fcr_daily", "fcr_cumulative",
+)
+
+
+def _group_starts(flock_idx):
+    """Índice de la primera fila de cada grupo contiguo de ``flock_idx``."""
+    return np.r_[0, np.flatnonzero(np.diff(flock_idx)) + 1]
+
+
+def _group_cumsum(values, starts):
+    """Suma acumulada que se reinicia al comienzo de cada grupo."""
+    total = np.cumsum(values, dtype=float)
+    lengths = np.diff(np.r_[starts, len(values)])
+    before_group = np.repeat(total[starts] - values[starts], lengths)
+    return total - before_group
+
+
+def _group_shift(values, starts, first_values):
+    """Valor de la fila anterior del mismo grupo; en la primera fila, ``first_values``."""
+    shifted = np.empty_like(values, dtype=float)
+    shifted[1:] = values[:-1]
+    shifted[starts] = first_values
+    return shifted
+
+
+def _safe_div(num, den):
+    out = np.zeros(np.broadcast(num, den).shape, dtype=float)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def interpolate_weights(flock_idx, age_day, weight_g, chick_weight_g):
+    """Peso interpolado por fila entre los días con muestreo.
+
+    Cada lote se coloca en su propio tramo del eje x (``lote * span + día``) para poder
+    interpolar todos a la vez con una sola llamada a ``np.interp``. El día 0 vale el peso
+    del pollito y después del último muestreo se mantiene el último peso.
+    """
+    n_flocks = len(chick_weight_g)
+    span = float(max(age_day.max(initial=0), 0) + 2)
+    sampled = weight_g > 0
+
+    # Último peso muestreado de cada lote (o el del pollito si no tiene muestreos)
+    last_weight = chick_weight_g.astype(float).copy()
+    sampled_idx = np.flatnonzero(sampled)
+    if len(sampled_idx):
+        # Al asignar con índices repetidos gana el último: las filas están ordenadas por día
+        last_weight[flock_idx[sampled_idx]] = weight_g[sampled_idx]
+
+    flocks = np.arange(n_flocks)
+    xp = np.concatenate([
+        flocks * span,
+        flock_idx[sampled] * span + age_day[sampled],
+        flocks * span + (span - 1),
+    ])
+    fp = np.concatenate([chick_weight_g, weight_g[sampled], last_weight])
+    order = np.argsort(xp, kind="stable")
+    return np.interp(flock_idx * span + age_day, xp[order], fp[order])
+
+
+def compute_growth_series(flock_idx, age_day, feed_kg, out_qty, weight_g, initial_qty, chick_weight_g):
+    """Series de crecimiento por fila para todos los lotes en una pasada.
+
+    Filas (un registro diario cada una), ordenadas por lote y día:
+        flock_idx: índice del lote (0..n-1), age_day: días desde el ingreso,
+        feed_kg: alimento del día, out_qty: bajas del día (mortalidad + descartes),
+        weight_g: peso muestreado (0 si no hubo muestreo).
+    Por lote: initial_qty (aves ingresadas) y chick_weight_g (peso del pollito).
+
+    Devuelve un dict con un arreglo por serie de ``GROWTH_SERIES``.
+    """
+    flock_idx = np.asarray(flock_idx, dtype=int)
+    age_day = np.clip(np.asarray(age_day, dtype=float), 0, None)
+    feed_kg = np.asarray(feed_kg, dtype=float)
+    out_qty = np.asarray(out_qty, dtype=float)
+    weight_g = np.asarray(weight_g, dtype=float)
+    initial_qty = np.asarray(initial_qty, dtype=float)
+    chick_weight_g = np.asarray(chick_weight_g, dtype=float)
+    if not len(flock_idx):
+        return {name: np.zeros(0) for name in GROWTH_SERIES}
+
+    starts = _group_starts(flock_idx)
+    chick = chick_weight_g[flock_idx]
+
+    alive = np.clip(initial_qty[flock_idx] - _group_cumsum(out_qty, starts), 0, None)
+    cum_feed_kg = _group_cumsum(feed_kg, starts)
+    weight = interpolate_weights(flock_idx, age_day, weight_g, chick_weight_g)
+
+    prev_weight = _group_shift(weight, starts, chick_weight_g[flock_idx[starts]])
+    prev_day = _group_shift(age_day, starts, 0.0)
+    adg = (weight - prev_weight) / np.maximum(age_day - prev_day, 1.0)
+
+    day_gain_kg = adg * alive / 1000.0
+    total_gain_kg = (weight - chick) * alive / 1000.0
+    return {
+        "age_day": age_day,
+        "alive_qty": alive,
+        "weight_g": weight,
+        "adg_g": adg,
+        "feed_per_bird_g": _safe_div(cum_feed_kg * 1000.0, alive),
+        "fcr_daily": _safe_div(feed_kg, day_gain_kg),
+        "fcr_cumulative": _safe_div(cum_feed_kg, total_gain_kg),
+    }
+
+
+# Valores de k probados al ajustar la curva de Gompertz (por día)
+GOMPERTZ_K_GRID = np.linspace(0.01, 0.15, 141)
+# Puntos mínimos para ajustar (incluido el peso del pollito en el día 0)
+GOMPERTZ_MIN_POINTS = 3
+
+
+def fit_gompertz(ages, weights, mask, k_grid=GOMPERTZ_K_GRID):
+    """Ajusta W(t) = L·exp(-b·exp(-k·t)) a muchos lotes a la vez.
+
+    ``ages``/``weights``/``mask`` son matrices (lotes × muestras) rellenadas; ``mask``
+    marca las muestras válidas. Para k fijo, ln W = ln L - b·exp(-k·t) es lineal en
+    (ln L, b), así que se resuelve por mínimos cuadrados cerrados para toda la rejilla
+    de k y todos los lotes en un solo cálculo, y se elige el k de menor error.
+
+    Devuelve (L, b, k); NaN en los lotes sin puntos suficientes o sin ajuste válido.
+    """
+    ages = np.asarray(ages, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    y = np.where(mask, np.log(np.where(mask, weights, 1.0)), 0.0)
+    n = mask.sum(axis=1).astype(float)
+
+    x = np.where(mask[None], np.exp(-k_grid[:, None, None] * ages[None]), 0.0)  # k × lotes × muestras
+    sx = x.sum(-1)
+    sy = y.sum(-1)[None]
+    sxx = (x * x).sum(-1)
+    sxy = (x * y[None]).sum(-1)
+    den = n * sxx - sx ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sxy - sx * sy) / den
+        intercept = (sy - slope * sx) / n
+    resid = np.where(mask[None], y[None] - (intercept[..., None] + slope[..., None] * x), 0.0)
+    sse = (resid ** 2).sum(-1)
+    # b = -pendiente debe ser positivo (curva creciente)
+    valid = (den > 1e-12) & (slope < 0) & np.isfinite(slope)
+    sse = np.where(valid, sse, np.inf)
+
+    best = np.argmin(sse, axis=0)
+    flocks = np.arange(len(n))
+    ok = (n >= GOMPERTZ_MIN_POINTS) & np.isfinite(sse[best, flocks])
+    big_l = np.where(ok, np.exp(intercept[best, flocks]), np.nan)
+    b = np.where(ok, -slope[best, flocks], np.nan)
+    k = np.where(ok, k_grid[best], np.nan)
+    return big_l, b, k
+
+
+def gompertz_age_for_weight(big_l, b, k, target_weight_g):
+    """Edad (días) en que la curva alcanza el peso objetivo; NaN si nunca lo alcanza."""
+    target = np.asarray(target_weight_g, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        age = -np.log(np.log(big_l / target) / b) / k
+    return np.where((target > 0) & (target < big_l) & np.isfinite(age), age, np.nan)
+
+
+class BroilerGrowthEngine(models.AbstractModel):
+    _name = "broiler.growth.engine"
+    _description = "Motor de curvas de crecimiento broiler"
+
+    @api.model
+    def _load_log_arrays(self, flocks):
+        """Registros diarios de los lotes como arreglos columnares ordenados por lote y día."""
+        flocks = flocks.filtered("id")
+        self.env["broiler.daily.log"].flush_model(
+            ["flock_id", "date", "feed_kg", "dead_qty", "culled_qty", "avg_weight_g"]
+        )
+        self.env.cr.execute("""
+            SELECT id, flock_id, date, feed_kg, dead_qty + culled_qty, avg_weight_g
+              FROM broiler_daily_log
+             WHERE flock_id = ANY(%s::int[])
+          ORDER BY flock_id, date, id
+        """, (flocks.ids,))
+        rows = self.env.cr.fetchall()
+
+        index_by_flock = {flock_id: idx for idx, flock_id in enumerate(flocks.ids)}
+        start_dates = np.array(
+            [flock.company_id._broiler_local_date(flock.date_in) if flock.date_in else np.datetime64("NaT")
+             for flock in flocks],
+            dtype="datetime64[D]",
+        )
+        columns = list(zip(*rows)) or [()] * 6
+        log_ids, flock_ids, dates, feed_kg, out_qty, weight_g = columns
+        flock_idx = np.array([index_by_flock[flock_id] for flock_id in flock_ids], dtype=int)
+        # Las filas vienen ordenadas por id de lote; el orden de ``flocks`` puede ser otro
+        order = np.argsort(flock_idx, kind="stable")
+        age_day = (np.array(dates, dtype="datetime64[D]") - start_dates[flock_idx]).astype(float)
+        return {
+            "log_ids": np.array(log_ids, dtype=int)[order],
+            "flock_idx": flock_idx[order],
+            "age_day": np.nan_to_num(age_day[order]),
+            "feed_kg": np.array(feed_kg, dtype=float)[order],
+            "out_qty": np.array(out_qty, dtype=float)[order],
+            "weight_g": np.array(weight_g, dtype=float)[order],
+            "initial_qty": np.array(flocks.mapped("initial_qty"), dtype=float),
+            "chick_weight_g": np.array(flocks.mapped("initial_weight_g"), dtype=float),
+        }
+
+    @api.model
+    def _compute_series(self, flocks):
+        """{log_id: {serie: valor}} para todos los registros de los lotes, en una pasada."""
+        data = self._load_log_arrays(flocks)
+        series = compute_growth_series(
+            data["flock_idx"], data["age_day"], data["feed_kg"], data["out_qty"],
+            data["weight_g"], data["initial_qty"], data["chick_weight_g"],
+        )
+        return {
+            int(log_id): {name: float(series[name][i]) for name in GROWTH_SERIES}
+            for i, log_id in enumerate(data["log_ids"])
+        }
+
+    @api.model
+    def _load_weight_samples(self, flocks):
+        """Muestras de peso por lote como matrices rellenadas (lotes × muestras).
+
+        La primera columna de cada lote es el peso del pollito en el día 0.
+        """
+        self.env["broiler.daily.log"].flush_model(["flock_id", "date", "avg_weight_g"])
+        self.env.cr.execute("""
+            SELECT flock_id, date, avg_weight_g
+              FROM broiler_daily_log
+             WHERE flock_id = ANY(%s::int[]) AND avg_weight_g > 0
+          ORDER BY flock_id, date, id
+        """, (flocks.ids,))
+        rows = self.env.cr.fetchall()
+        index_by_flock = {flock_id: idx for idx, flock_id in enumerate(flocks.ids)}
+        start_dates = np.array(
+            [flock.company_id._broiler_local_date(flock.date_in) for flock in flocks], dtype="datetime64[D]",
+        )
+
+        flock_ids, dates, weights = list(zip(*rows)) or ((), (), ())
+        flock_idx = np.array([index_by_flock[flock_id] for flock_id in flock_ids], dtype=int)
+        order = np.argsort(flock_idx, kind="stable")
+        flock_idx = flock_idx[order]
+        ages = (np.array(dates, dtype="datetime64[D]")[order] - start_dates[flock_idx]).astype(float)
+        weights = np.array(weights, dtype=float)[order]
+
+        counts = np.bincount(flock_idx, minlength=len(flocks))
+        width = int(counts.max(initial=0)) + 1
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        col = np.arange(len(flock_idx)) - starts[flock_idx] + 1 if len(flock_idx) else np.zeros(0, dtype=int)
+
+        age_m = np.zeros((len(flocks), width))
+        weight_m = np.zeros((len(flocks), width))
+        mask = np.zeros((len(flocks), width), dtype=bool)
+        weight_m[:, 0] = flocks.mapped("initial_weight_g")
+        mask[:, 0] = weight_m[:, 0] > 0
+        age_m[flock_idx, col] = np.clip(ages, 0, None)
+        weight_m[flock_idx, col] = weights
+        mask[flock_idx, col] = True
+        return age_m, weight_m, mask, counts
+
+    @api.model
+    def _get_recent_out_rate(self, flocks, days=7):
+        """Tasa diaria de bajas (mortalidad + descartes) de los últimos ``days`` días registrados."""
+        self.env.cr.execute("""
+            SELECT flock_id, SUM(dead_qty + culled_qty)
+              FROM (
+                    SELECT flock_id, date, dead_qty, culled_qty,
+                           MAX(date) OVER (PARTITION BY flock_id) AS last_date
+                      FROM broiler_daily_log
+                     WHERE flock_id = ANY(%s::int[])
+              ) recent
+             WHERE date > last_date - %s
+          GROUP BY flock_id
+        """, (flocks.ids, days))
+        out_by_flock = dict(self.env.cr.fetchall())
+        alive = np.array(flocks.mapped("alive_qty"), dtype=float)
+        out = np.array([out_by_flock.get(flock_id) or 0 for flock_id in flocks.ids], dtype=float)
+        return np.clip(_safe_div(out / days, alive), 0.0, 1.0)
+
+    @api.model
+    def _compute_forecasts(self, flocks):
+        """Ajuste de Gompertz y proyección de cosecha de todos los lotes en una pasada.
+
+        Devuelve {flock_id: valores de los campos forecast_* del lote}.
+        """
+        flocks = flocks.filtered("id")
+        if not flocks:
+            return {}
+        self.env["broiler.daily.log"].flush_model(["dead_qty", "culled_qty"])
+        age_m, weight_m, mask, counts = self._load_weight_samples(flocks)
+        big_l, b, k = fit_gompertz(age_m, weight_m, mask)
+        target = np.array(flocks.mapped("target_weight_g"), dtype=float)
+        harvest_age = gompertz_age_for_weight(big_l, b, k, target)
+
+        current_age = np.array(flocks.mapped("age_days"), dtype=float)
+        rate = self._get_recent_out_rate(flocks)
+        days_left = np.clip(np.nan_to_num(harvest_age) - current_age, 0, None)
+        alive_at_harvest = np.array(flocks.mapped("alive_qty"), dtype=float) * (1.0 - rate) ** days_left
+
+        values = {}
+        for i, flock in enumerate(flocks):
+            fitted = bool(np.isfinite(big_l[i]))
+            reached = bool(np.isfinite(harvest_age[i]))
+            start = flock.company_id._broiler_local_date(flock.date_in)
+            values[flock.id] = {
+                "forecast_sample_count": int(counts[i]),
+                "forecast_asymptote_g": float(big_l[i]) if fitted else 0.0,
+                "forecast_b": float(b[i]) if fitted else 0.0,
+                "forecast_k": float(k[i]) if fitted else 0.0,
+                "forecast_harvest_age": float(harvest_age[i]) if reached else 0.0,
+                "forecast_harvest_date": (
+                    fields.Date.add(start, days=int(np.ceil(harvest_age[i]))) if reached else False
+                ),
+                "forecast_alive_qty": int(round(alive_at_harvest[i])) if reached else 0,
+                "forecast_live_kg": float(alive_at_harvest[i] * target[i] / 1000.0) if reached else 0.0,
+            }
+        return values
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+PERF_PARAM = "broiler_farm.perf_instrumentation"
+PERF_FLUSH_INTERVAL = 60  # segundos
+
+# {base de datos: {método: [llamadas, consultas, tiempo SQL, tiempo total]}} de este proceso
+_pending = defaultdict(lambda: defaultdict(lambda: [0, 0, 0.0, 0.0]))
+_pending_lock = threading.Lock()
+_last_flush = {}
+_active = threading.local()
+
+
+def _perf_enabled(env):
+    if env.context.get("broiler_perf"):
+        return True
+    return env["ir.config_parameter"].sudo().get_param(PERF_PARAM) in ("1", "True", "true")
+
+
+def broiler_perf(func):
+    """Mide llamadas, consultas SQL, tiempo SQL y tiempo total del método decorado.
+
+    Solo actúa con el parámetro ``broiler_farm.perf_instrumentation`` activo o con
+    ``broiler_perf`` en el contexto. Las mediciones se acumulan en memoria y cada
+    ``PERF_FLUSH_INTERVAL`` segundos se vuelcan a ``broiler.perf.stat`` con un cursor
+    aparte. Los tiempos son inclusivos: un método medido que llama a otro incluye su costo.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        env = self.env
+        key = "%s.%s" % (self._name, func.__name__)
+        running = getattr(_active, "keys", None)
+        if running is None:
+            running = _active.keys = set()
+        # Las llamadas recursivas (p. ej. por empresa) ya se cuentan en la exterior
+        if key in running or not _perf_enabled(env):
+            return func(self, *args, **kwargs)
+        running.add(key)
+        thread = threading.current_thread()
+        # sql_db acumula en estos atributos del hilo cuando existen
+        if not hasattr(thread, "query_count"):
+            thread.query_count = 0
+            thread.query_time = 0.0
+        queries, query_time = thread.query_count, thread.query_time
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            running.discard(key)
+            with _pending_lock:
+                stat = _pending[env.cr.dbname][key]
+                stat[0] += 1
+                stat[1] += thread.query_count - queries
+                stat[2] += thread.query_time - query_time
+                stat[3] += time.perf_counter() - start
+            if time.monotonic() - _last_flush.setdefault(env.cr.dbname, time.monotonic()) > PERF_FLUSH_INTERVAL:
+                env["broiler.perf.stat"]._flush_pending()
+    return wrapper
+
+
+class BroilerPerfStat(models.Model):
+    _name = "broiler.perf.stat"
+    _description = "Medición de rendimiento broiler"
+    _order = "total_time desc"
+    _rec_name = "method"
+
+    method = fields.Char(string="Método", required=True, readonly=True, index=True)
+    date = fields.Date(string="Día", required=True, readonly=True, index=True)
+    call_count = fields.Integer(string="Llamadas", readonly=True, aggregator="sum")
+    query_count = fields.Integer(string="Consultas SQL", readonly=True, aggregator="sum")
+    sql_time = fields.Float(string="Tiempo SQL (s)", readonly=True, digits=(16, 3), aggregator="sum")
+    total_time = fields.Float(string="Tiempo total (s)", readonly=True, digits=(16, 3), aggregator="sum")
+    avg_time_ms = fields.Float(string="Promedio (ms)", readonly=True, digits=(16, 1), aggregator="max")
+    avg_queries = fields.Float(string="Consultas por llamada", readonly=True, digits=(16, 1), aggregator="max")
+
+    _sql_constraints = [
+        ("uniq_perf_stat_method_date", "unique(method, date)", "Ya existe una medición para este método y día.")
+    ]
+
+    @api.model
+    def _flush_pending(self):
+        """Vuelca lo acumulado en este proceso con un cursor propio (no depende de la
+        transacción que se está midiendo, que puede revertirse)."""
+        dbname = self.env.cr.dbname
+        with _pending_lock:
+            pending = _pending.pop(dbname, None)
+            _last_flush[dbname] = time.monotonic()
+        if not pending:
+            return
+        today = fields.Date.context_today(self)
+        try:
+            with self.env.registry.cursor() as cr:
+                for method, (calls, queries, sql_time, total_time) in pending.items():
+                    cr.execute("""
+                        INSERT INTO broiler_perf_stat (method, date, call_count, query_count, sql_time, total_time,
+                                                       avg_time_ms, avg_queries, create_date, write_date)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC')
+                        ON CONFLICT (method, date) DO UPDATE SET
+                            call_count = broiler_perf_stat.call_count + EXCLUDED.call_count,
+                            query_count = broiler_perf_stat.query_count + EXCLUDED.query_count,
+                            sql_time = broiler_perf_stat.sql_time + EXCLUDED.sql_time,
+                            total_time = broiler_perf_stat.total_time + EXCLUDED.total_time,
+                            avg_time_ms = 1000 * (broiler_perf_stat.total_time + EXCLUDED.total_time)
+                                          / (broiler_perf_stat.call_count + EXCLUDED.call_count),
+                            avg_queries = (broiler_perf_stat.query_count + EXCLUDED.query_count)::float
+                                          / (broiler_perf_stat.call_count + EXCLUDED.call_count),
+                            write_date = EXCLUDED.write_date
+                    """, (method, today, calls, queries, sql_time, total_time,
+                          1000 * total_time / calls, queries / calls))
+        except Exception:
+            _logger.exception("No se pudieron guardar las mediciones de rendimiento")
+
+    def action_flush(self):
+        self._flush_pending()
+        return {"type": "ir.actions.client", "tag": "reload"}
+
+    @api.model
+    def action_enable(self):
+        self.env["ir.config_parameter"].sudo().set_param(PERF_PARAM, "1")
+        return True
+
+    @api.model
+    def action_disable(self):
+        self._flush_pending()
+        self.env["ir.config_parameter"].sudo().set_param(PERF_PARAM, "0")
+        return True
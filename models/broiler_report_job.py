@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import base64
+import logging
+import time
+
+from odoo import api, fields, models
+from odoo.tools.pdf import merge_pdf
+
+_logger = logging.getLogger(__name__)
+
+REPORT_XMLID = "broiler_farm.action_report_broiler_flock"
+
+
+class BroilerReportJob(models.Model):
+    """Reporte de Lote de muchos lotes generado en segundo plano.
+
+    El cron renderiza los lotes por bloques; cada bloque se guarda como adjunto parcial
+    y se confirma, así que un fallo no repite los bloques ya hechos. Al terminar se unen
+    las partes en un solo PDF y se notifica al usuario con el archivo adjunto.
+    """
+    _name = "broiler.report.job"
+    _description = "Reporte de lotes en segundo plano"
+    _inherit = ["mail.thread"]
+    _order = "id desc"
+
+    name = fields.Char(string="Descripción", required=True)
+    user_id = fields.Many2one("res.users", string="Solicitado por", required=True, default=lambda self: self.env.user)
+    flock_ids = fields.Many2many("broiler.flock", string="Lotes", required=True)
+    chunk_size = fields.Integer(string="Lotes por bloque", default=20, required=True)
+    state = fields.Selection([
+        ("pending", "Pendiente"),
+        ("done", "Terminado"),
+        ("failed", "Con error"),
+    ], string="Estado", default="pending", readonly=True, tracking=True)
+    rendered_count = fields.Integer(string="Lotes renderizados", readonly=True)
+    part_attachment_ids = fields.Many2many(
+        "ir.attachment", "broiler_report_job_part_rel", "job_id", "attachment_id",
+        string="Partes", readonly=True,
+    )
+    attachment_id = fields.Many2one("ir.attachment", string="PDF", readonly=True)
+    last_error = fields.Text(string="Último error", readonly=True)
+
+    @api.model
+    def _enqueue(self, flocks):
+        job = self.create({
+            "name": "Reporte de %s lotes" % len(flocks),
+            "flock_ids": [(6, 0, flocks.ids)],
+        })
+        self.env.ref("broiler_farm.ir_cron_broiler_report_jobs")._trigger()
+        return job
+
+    @api.model
+    def _cron_render_jobs(self, time_limit=240):
+        start = time.monotonic()
+        for job in self.search([("state", "=", "pending")], order="id"):
+            remaining = time_limit - (time.monotonic() - start)
+            if remaining <= 0:
+                self.env.ref("broiler_farm.ir_cron_broiler_report_jobs")._trigger()
+                break
+            job._render_chunks(remaining)
+
+    def _render_chunks(self, time_limit):
+        self.ensure_one()
+        start = time.monotonic()
+        Report = self.env["ir.actions.report"].with_user(self.user_id)
+        flock_ids = self.flock_ids.sorted("id").ids
+        while self.rendered_count < len(flock_ids):
+            if time.monotonic() - start > time_limit:
+                self.env.ref("broiler_farm.ir_cron_broiler_report_jobs")._trigger()
+                return
+            chunk = flock_ids[self.rendered_count:self.rendered_count + self.chunk_size]
+            try:
+                pdf, _ = Report._render_qweb_pdf(REPORT_XMLID, res_ids=chunk)
+            except Exception as e:
+                self.env.cr.rollback()
+                self.env.invalidate_all()
+                self.write({"state": "failed", "last_error": str(e)})
+                self.env.cr.commit()
+                _logger.exception("Reporte de lotes %s: error en el bloque desde %s", self.id, self.rendered_count)
+                return
+            part = self.env["ir.attachment"].create({
+                "name": "%s_parte_%04d.pdf" % (self.name, len(self.part_attachment_ids) + 1),
+                "raw": pdf,
+                "res_model": self._name,
+                "res_id": self.id,
+                "mimetype": "application/pdf",
+            })
+            self.write({
+                "rendered_count": self.rendered_count + len(chunk),
+                "part_attachment_ids": [(4, part.id)],
+            })
+            self.env.cr.commit()
+            _logger.info("Reporte de lotes %s: %s/%s lotes", self.id, self.rendered_count, len(flock_ids))
+        self._finalize()
+        self.env.cr.commit()
+
+    def _finalize(self):
+        """Une las partes en un PDF, lo adjunta y avisa al usuario."""
+        self.ensure_one()
+        parts = self.part_attachment_ids.sorted("id")
+        merged = merge_pdf([part.raw for part in parts]) if len(parts) > 1 else parts.raw
+        attachment = self.env["ir.attachment"].create({
+            "name": "Reporte_Lotes_%s.pdf" % fields.Date.context_today(self).strftime("%Y%m%d"),
+            "datas": base64.b64encode(merged),
+            "res_model": self._name,
+            "res_id": self.id,
+            "mimetype": "application/pdf",
+        })
+        parts.unlink()
+        self.write({"state": "done", "attachment_id": attachment.id})
+        self.message_post(
+            body="El reporte de %s lotes está listo." % len(self.flock_ids),
+            attachment_ids=[attachment.id],
+            partner_ids=self.user_id.partner_id.ids,
+            subtype_xmlid="mail.mt_comment",
+        )
+
+    def action_retry(self):
+        self.filtered(lambda j: j.state == "failed").write({"state": "pending", "last_error": False})
+        self.env.ref("broiler_farm.ir_cron_broiler_report_jobs")._trigger()
+        return True
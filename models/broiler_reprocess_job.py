@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+
+class BroilerReprocessJob(models.Model):
+    """Re-procesa los movimientos de stock de los registros diarios por bloques.
+
+    Cada bloque se confirma (commit) y deja como punto de control el último id
+    procesado, de modo que si el proceso se cae el siguiente cron continúa desde ahí.
+    Si un bloque falla se reintenta registro por registro: los que fallan quedan
+    anotados en ``last_error`` y el job sigue con el resto.
+    """
+    _name = "broiler.reprocess.job"
+    _description = "Re-proceso de movimientos de stock por bloques"
+    _order = "id desc"
+
+    name = fields.Char(string="Descripción", required=True, default="Re-proceso de movimientos")
+    state = fields.Selection([
+        ("draft", "Borrador"),
+        ("running", "En curso"),
+        ("done", "Terminado"),
+        ("failed", "Con error"),
+        ("cancel", "Cancelado"),
+    ], string="Estado", default="draft", readonly=True)
+
+    # Filtros
+    company_id = fields.Many2one("res.company", string="Empresa")
+    flock_ids = fields.Many2many("broiler.flock", string="Lotes")
+    date_from = fields.Date(string="Desde")
+    date_to = fields.Date(string="Hasta")
+    log_ids = fields.Many2many("broiler.daily.log", string="Registros seleccionados")
+    chunk_size = fields.Integer(string="Registros por bloque", default=200, required=True)
+
+    # Avance
+    last_log_id = fields.Integer(string="Último registro procesado", readonly=True)
+    total_count = fields.Integer(string="Total a procesar", readonly=True)
+    processed_count = fields.Integer(string="Procesados", readonly=True)
+    failed_count = fields.Integer(string="Con error", readonly=True)
+    progress = fields.Float(string="Avance (%)", compute="_compute_progress")
+    elapsed_seconds = fields.Float(string="Tiempo de proceso (s)", readonly=True, digits=(16, 1))
+    throughput = fields.Float(string="Registros por segundo", readonly=True, digits=(16, 2))
+    date_started = fields.Datetime(string="Iniciado", readonly=True)
+    date_finished = fields.Datetime(string="Terminado", readonly=True)
+    last_error = fields.Text(string="Último error", readonly=True)
+
+    @api.depends("processed_count", "total_count")
+    def _compute_progress(self):
+        for job in self:
+            job.progress = (job.processed_count / job.total_count * 100.0) if job.total_count else 0.0
+
+    @api.constrains("chunk_size")
+    def _check_chunk_size(self):
+        for job in self:
+            if job.chunk_size <= 0:
+                raise ValidationError("El tamaño de bloque debe ser mayor que 0.")
+
+    def _get_log_domain(self):
+        self.ensure_one()
+        domain = []
+        if self.company_id:
+            domain.append(("company_id", "=", self.company_id.id))
+        if self.flock_ids:
+            domain.append(("flock_id", "in", self.flock_ids.ids))
+        if self.date_from:
+            domain.append(("date", ">=", self.date_from))
+        if self.date_to:
+            domain.append(("date", "<=", self.date_to))
+        if self.log_ids:
+            domain.append(("id", "in", self.log_ids.ids))
+        return domain
+
+    def action_start(self):
+        for job in self.filtered(lambda j: j.state in ("draft", "failed", "cancel")):
+            vals = {"state": "running", "last_error": False}
+            if job.state != "failed":
+                # Un job con error se reanuda desde su punto de control
+                vals.update({
+                    "last_log_id": 0,
+                    "processed_count": 0,
+                    "failed_count": 0,
+                    "elapsed_seconds": 0.0,
+                    "throughput": 0.0,
+                    "date_started": fields.Datetime.now(),
+                    "date_finished": False,
+                    "total_count": self.env["broiler.daily.log"].search_count(job._get_log_domain()),
+                })
+            job.write(vals)
+        self.env.ref("broiler_farm.ir_cron_broiler_reprocess_jobs")._trigger()
+        return True
+
+    def action_cancel(self):
+        self.filtered(lambda j: j.state == "running").write({"state": "cancel"})
+        return True
+
+    @api.model
+    def _cron_run_jobs(self, time_limit=240):
+        start = time.monotonic()
+        for job in self.search([("state", "=", "running")], order="id"):
+            remaining = time_limit - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            job._run_chunks(remaining)
+        if self.search_count([("state", "=", "running")], limit=1):
+            # Quedan bloques: se vuelve a programar en vez de esperar al intervalo
+            self.env.ref("broiler_farm.ir_cron_broiler_reprocess_jobs")._trigger()
+
+    def _run_chunks(self, time_limit):
+        """Procesa bloques hasta terminar o agotar ``time_limit`` segundos."""
+        self.ensure_one()
+        Log = self.env["broiler.daily.log"]
+        start = time.monotonic()
+        domain = self._get_log_domain()
+        while time.monotonic() - start < time_limit:
+            # Bloqueo del job: otro worker que lo tome a la vez lo salta
+            self.env.cr.execute(
+                "SELECT state FROM broiler_reprocess_job WHERE id = %s FOR UPDATE SKIP LOCKED", (self.id,)
+            )
+            row = self.env.cr.fetchone()
+            if not row or row[0] != "running":
+                return
+            self.invalidate_recordset()
+
+            logs = Log.search(domain + [("id", ">", self.last_log_id)], order="id", limit=self.chunk_size)
+            if not logs:
+                self.write({"state": "done", "date_finished": fields.Datetime.now()})
+                self.env.cr.commit()
+                _logger.info("REPROCESS %s: terminado, %s registros", self.name, self.processed_count)
+                return
+
+            chunk_start = time.monotonic()
+            try:
+                errors = self._sync_chunk(logs)
+            except Exception as e:
+                self.env.cr.rollback()
+                self.env.invalidate_all()
+                self.write({"state": "failed", "last_error": str(e)})
+                self.env.cr.commit()
+                _logger.exception("REPROCESS %s: error en el bloque tras el registro %s", self.name, self.last_log_id)
+                return
+
+            elapsed = self.elapsed_seconds + (time.monotonic() - chunk_start)
+            processed = self.processed_count + len(logs)
+            vals = {
+                "last_log_id": logs[-1].id,
+                "processed_count": processed,
+                "elapsed_seconds": elapsed,
+                "throughput": processed / elapsed if elapsed else 0.0,
+            }
+            if errors:
+                vals["failed_count"] = self.failed_count + len(errors)
+                vals["last_error"] = "\n".join(filter(None, [self.last_error] + [
+                    "Registro %s: %s" % (log_id, error) for log_id, error in errors.items()
+                ]))
+            self.write(vals)
+            self.env.cr.commit()
+            _logger.info(
+                "REPROCESS %s: %s/%s registros (%.1f%%), %.2f registros/s",
+                self.name, processed, self.total_count, self.progress, self.throughput,
+            )
+
+    def _sync_chunk(self, logs):
+        """Sincroniza el bloque; si falla, registro por registro (como la cola de stock).
+
+        Devuelve {log_id: error} de los registros que no se pudieron sincronizar, que
+        quedan marcados con error en el propio registro diario.
+        """
+        errors = {}
+        try:
+            with self.env.cr.savepoint():
+                logs._sync_stock_consumption_moves()
+        except Exception:
+            for log in logs:
+                try:
+                    with self.env.cr.savepoint():
+                        log._sync_stock_consumption_moves()
+                except Exception as e:
+                    _logger.warning("REPROCESS %s: error en registro %s: %s", self.name, log.id, e)
+                    errors[log.id] = str(e)
+        logs.browse(list(errors))._set_stock_sync_state("error", errors)
+        return errors
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class BroilerStockSyncQueue(models.Model):
+    """Cola de registros diarios con el stock pendiente de sincronizar.
+
+    Una fila por registro: varias ediciones seguidas solo incrementan ``version`` y se
+    resuelven con una única sincronización. El cron toma las filas con
+    ``FOR UPDATE SKIP LOCKED``, así que varios workers pueden procesar la cola a la vez.
+    """
+    _name = "broiler.stock.sync.queue"
+    _description = "Cola de sincronización de stock de registros diarios"
+    _order = "id"
+
+    log_id = fields.Many2one("broiler.daily.log", string="Registro diario", required=True, ondelete="cascade")
+    company_id = fields.Many2one("res.company", string="Empresa")
+    version = fields.Integer(string="Versión", default=1)
+    attempts = fields.Integer(string="Intentos", default=0)
+    last_error = fields.Text(string="Último error")
+
+    _sql_constraints = [
+        ("uniq_broiler_stock_sync_queue_log", "unique(log_id)", "El registro ya está en la cola."),
+    ]
+
+    MAX_ATTEMPTS = 5
+    COALESCE_DELAY = timedelta(seconds=30)
+
+    @api.model
+    def _enqueue(self, logs):
+        """Marca los registros como pendientes; si ya estaban en cola solo sube la versión."""
+        if not logs:
+            return
+        # La empresa se lee de la tabla: los registros recién creados pueden tenerla pendiente
+        logs.flush_recordset(["company_id"])
+        self.env.cr.execute("""
+            INSERT INTO broiler_stock_sync_queue
+                   (log_id, company_id, version, attempts, create_uid, write_uid, create_date, write_date)
+            SELECT id, company_id, 1, 0, %(uid)s, %(uid)s,
+                   now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC'
+            FROM broiler_daily_log
+            WHERE id IN %(ids)s
+            ON CONFLICT (log_id) DO UPDATE
+               SET version = broiler_stock_sync_queue.version + 1,
+                   attempts = 0,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, {"uid": self.env.uid, "ids": tuple(logs.ids)})
+        logs._set_stock_sync_state("pending")
+        cron = self.env.ref("broiler_farm.ir_cron_broiler_stock_sync_queue", raise_if_not_found=False)
+        if cron:
+            # Se espera un poco para que las ediciones seguidas se acumulen en una sola
+            cron._trigger(at=fields.Datetime.now() + self.COALESCE_DELAY)
+
+    @api.model
+    def _cron_process_queue(self, batch_size=200, time_limit=240):
+        """Procesa la cola por lotes, con commit tras cada lote."""
+        start = time.monotonic()
+        seen_ids = []
+        done = failed = 0
+        while time.monotonic() - start < time_limit:
+            self.env.cr.execute("""
+                SELECT id, log_id, version
+                FROM broiler_stock_sync_queue
+                WHERE attempts < %s AND NOT (id = ANY(%s::int[]))
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (self.MAX_ATTEMPTS, seen_ids, batch_size))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            seen_ids += [row[0] for row in rows]
+            batch_done, batch_failed = self._process_rows(rows)
+            done += batch_done
+            failed += batch_failed
+            self.env.cr.commit()
+        if done or failed:
+            _logger.info("Cola de stock broiler: %s registros sincronizados, %s con error", done, failed)
+
+    @api.model
+    def _process_rows(self, rows):
+        Log = self.env["broiler.daily.log"]
+        logs = Log.browse([log_id for _id, log_id, _version in rows]).exists()
+        errors = {}
+        try:
+            with self.env.cr.savepoint():
+                logs._sync_stock_consumption_moves()
+        except Exception:
+            # Se aísla el registro que falla y se sincroniza el resto
+            for log in logs:
+                try:
+                    with self.env.cr.savepoint():
+                        log._sync_stock_consumption_moves()
+                except Exception as e:
+                    _logger.warning("Cola de stock broiler: error en registro %s: %s", log.id, e)
+                    errors[log.id] = str(e)
+
+        ok_rows = [(queue_id, version) for queue_id, log_id, version in rows if log_id not in errors]
+        synced_log_ids = []
+        if ok_rows:
+            # Si el registro se volvió a editar mientras se procesaba, su fila queda en cola
+            self.env.cr.execute("""
+                DELETE FROM broiler_stock_sync_queue q
+                USING (SELECT unnest(%s::int[]) AS id, unnest(%s::int[]) AS version) d
+                WHERE q.id = d.id AND q.version = d.version
+                RETURNING q.log_id
+            """, ([queue_id for queue_id, _v in ok_rows], [version for _id, version in ok_rows]))
+            synced_log_ids = [row[0] for row in self.env.cr.fetchall()]
+        for log_id, error in errors.items():
+            self.env.cr.execute("""
+                UPDATE broiler_stock_sync_queue
+                   SET attempts = attempts + 1, last_error = %s
+                 WHERE log_id = %s
+            """, (error, log_id))
+
+        Log.browse(synced_log_ids)._set_stock_sync_state("synced")
+        Log.browse(list(errors))._set_stock_sync_state("error", errors)
+        return len(synced_log_ids), len(errors)
@@ -0,0 +1,84 @@
+from odoo import api, models, tools
+from odoo.exceptions import UserError
+
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    # -------------------------
+    # Resolución plantilla -> variantes (caché del registro)
+    # -------------------------
+    @api.model
+    @tools.ormcache("tmpl_ids")
+    def _broiler_variant_ids_by_template(self, tmpl_ids):
+        """Variantes activas de cada plantilla en una sola consulta.
+
+        ``tmpl_ids`` es una tupla ordenada (clave de la caché). Devuelve una tupla de
+        pares ``(tmpl_id, (variant_id, ...))``; solo ids, nunca registros, para que el
+        valor sea independiente del entorno.
+        """
+        # Dominio explícito sobre active: el resultado no depende del contexto del llamador
+        groups = self.sudo().with_context(active_test=False)._read_group(
+            [("product_tmpl_id", "in", list(tmpl_ids)), ("active", "=", True)],
+            ["product_tmpl_id"],
+            ["id:array_agg"],
+        )
+        return tuple((tmpl.id, tuple(sorted(ids))) for tmpl, ids in groups)
+
+    @api.model
+    def _broiler_get_variants_by_template(self, templates):
+        """Forma en lote: {tmpl_id: product.product} con todas las variantes activas."""
+        if not templates:
+            return {}
+        pairs = self._broiler_variant_ids_by_template(tuple(sorted(set(templates.ids))))
+        return {tmpl_id: self.browse(ids) for tmpl_id, ids in pairs}
+
+    @api.model
+    def _broiler_get_single_variant_by_template(self, templates):
+        """{tmpl_id: variante} exigiendo una sola variante por plantilla.
+
+        Las plantillas de alimento con varias variantes no se resuelven tomando la
+        primera: el consumo quedaría cargado a una variante arbitraria.
+        """
+        variants_by_tmpl = self._broiler_get_variants_by_template(templates)
+        ambiguous = templates.filtered(lambda t: len(variants_by_tmpl.get(t.id, ())) > 1)
+        if ambiguous:
+            raise UserError(
+                "Los productos de alimento deben tener una sola variante: %s"
+                % ", ".join(ambiguous.mapped("display_name"))
+            )
+        return variants_by_tmpl
+
+    # -------------------------
+    # Invalidación
+    # -------------------------
+    @api.model
+    def _broiler_clear_variant_cache(self, templates):
+        """Vacía la caché si cambian las variantes de alguna plantilla consumible.
+
+        No se limita a las plantillas que ya usa un lote o registro diario: las consultas
+        de formularios sin guardar (onchange) también llenan la caché con plantillas que
+        ningún registro guardado referencia. Los productos de servicio nunca se consultan.
+        """
+        if any(template.type == "consu" for template in templates):
+            self.env.registry.clear_cache()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        self._broiler_clear_variant_cache(products.product_tmpl_id)
+        return products
+
+    def write(self, vals):
+        track = "active" in vals or "product_tmpl_id" in vals
+        templates = self.product_tmpl_id if track else None
+        res = super().write(vals)
+        if track:
+            self._broiler_clear_variant_cache(templates | self.product_tmpl_id)
+        return res
+
+    def unlink(self):
+        templates = self.product_tmpl_id
+        res = super().unlink()
+        self._broiler_clear_variant_cache(templates.exists())
+        return res
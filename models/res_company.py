@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import pytz
+
+from odoo import api, fields, models, tools
+
+# Clave del bloqueo consultivo para crear las ubicaciones broiler de una empresa
+BROILER_LOCATION_LOCK_KEY = 48151
+
+
+class ResCompany(models.Model):
+    _inherit = "res.company"
+
+    broiler_age_rollover_date = fields.Date(
+        string="Último cambio de día (edad de lotes)",
+        readonly=True,
+        help="Fecha local en la que se actualizó por última vez la edad de los lotes activos",
+    )
+    broiler_deferred_stock_sync = fields.Boolean(
+        string="Sincronizar stock de registros diarios en segundo plano",
+        help="Los cambios de alimento en los registros diarios se encolan y un proceso "
+             "programado genera los movimientos; varias ediciones seguidas de un registro "
+             "se resuelven con una sola sincronización.",
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        companies = super().create(vals_list)
+        companies._broiler_create_flock_sequences()
+        return companies
+
+    def _broiler_create_flock_sequences(self):
+        """Crea la secuencia de lotes (broiler.flock) de las empresas que no la tengan.
+
+        Sin registros, revisa todas las empresas (llamada desde data/flock_sequence.xml).
+        """
+        companies = self or self.search([])
+        Sequence = self.env["ir.sequence"].sudo()
+        existing = Sequence.search([("code", "=", "broiler.flock"), ("company_id", "in", companies.ids)])
+        missing = companies - existing.company_id
+        if missing:
+            Sequence.create([{
+                "name": "Lotes broiler - %s" % company.name,
+                "code": "broiler.flock",
+                "implementation": "standard",
+                "prefix": "LOTE_%(day)s%(month)s%(year)s-",
+                "padding": 4,
+                "company_id": company.id,
+            } for company in missing])
+
+    def _broiler_tz(self):
+        """Zona horaria de la empresa (la de su contacto), UTC si no tiene."""
+        self.ensure_one()
+        return pytz.timezone(self.partner_id.tz or "UTC")
+
+    def _broiler_local_date(self, dt):
+        """Fecha local de la empresa para un Datetime UTC de Odoo."""
+        self.ensure_one()
+        return pytz.utc.localize(dt).astimezone(self._broiler_tz()).date()
+
+    def _broiler_local_today(self):
+        self.ensure_one()
+        return self._broiler_local_date(fields.Datetime.now())
+
+    # -------------------------
+    # Ubicaciones y tipo de operación broiler (caché por empresa)
+    # -------------------------
+    @api.model
+    @tools.ormcache("company_id")
+    def _broiler_salida_picking_type_id(self, company_id):
+        """Id del tipo de operación Salida Broiler de la empresa (False si no hay)."""
+        picking_type = self.env.ref("broiler_farm.picking_type_salida_broiler", raise_if_not_found=False)
+        if picking_type and picking_type.sudo().company_id.id in (False, company_id):
+            return picking_type.id
+        picking_type = self.env["stock.picking.type"].sudo().search([
+            ("sequence_code", "=", "SB"),
+            ("code", "=", "outgoing"),
+            ("company_id", "in", (False, company_id)),
+        ], order="company_id", limit=1)
+        return picking_type.id
+
+    def _broiler_get_salida_picking_type(self):
+        self.ensure_one()
+        return self.env["stock.picking.type"].browse(self._broiler_salida_picking_type_id(self.id))
+
+    @api.model
+    @tools.ormcache("company_id")
+    def _broiler_location_ids(self, company_id):
+        """{función: id} de las ubicaciones broiler ya existentes de la empresa."""
+        company = self.browse(company_id)
+        return {role: loc.id for role, loc in company._broiler_find_locations().items()}
+
+    def _broiler_find_locations(self):
+        """{función: ubicación} de la empresa, o compartidas (sin empresa) si no tiene propias.
+
+        Las ubicaciones sin empresa son las de instalaciones anteriores que la migración
+        1.0.3 marcó con su función; la de la empresa tiene prioridad.
+        """
+        self.ensure_one()
+        locations = self.env["stock.location"].sudo().search([
+            ("broiler_role", "!=", False),
+            ("company_id", "in", (False, self.id)),
+        ])
+        by_role = {}
+        for loc in locations.sorted(lambda l: bool(l.company_id)):
+            by_role[loc.broiler_role] = loc
+        return by_role
+
+    def _broiler_get_stock_location(self):
+        """Ubicación de existencias del almacén principal de la empresa."""
+        self.ensure_one()
+        warehouse = self.env["stock.warehouse"].sudo().search([("company_id", "=", self.id)], limit=1)
+        return warehouse.lot_stock_id or self.env.ref("stock.stock_location_stock")
+
+    def _broiler_get_location(self, role):
+        self.ensure_one()
+        location_id = self._broiler_location_ids(self.id).get(role)
+        if not location_id:
+            location_id = self._broiler_create_locations()[role]
+        return self.env["stock.location"].browse(location_id)
+
+    def _broiler_get_parent_location(self):
+        return self._broiler_get_location("parent")
+
+    def _broiler_get_consumption_location(self):
+        return self._broiler_get_location("consumption")
+
+    def _broiler_create_locations(self):
+        """Crea las ubicaciones broiler que falten en la empresa.
+
+        El bloqueo consultivo serializa a los workers que llegan a la vez; el índice único
+        por empresa y función impide el duplicado aunque el otro worker haya confirmado
+        después de que esta transacción tomara su instantánea.
+        """
+        self.ensure_one()
+        self.env.cr.execute("SELECT pg_advisory_xact_lock(%s, %s)", (BROILER_LOCATION_LOCK_KEY, self.id))
+        StockLoc = self.env["stock.location"].sudo()
+        by_role = self._broiler_find_locations()
+        if "parent" not in by_role:
+            by_role["parent"] = StockLoc.create({
+                "name": "Broiler",
+                "usage": "internal",
+                "location_id": self._broiler_get_stock_location().id,
+                "company_id": self.id,
+                "broiler_role": "parent",
+            })
+        if "consumption" not in by_role:
+            by_role["consumption"] = StockLoc.create({
+                "name": "Consumo",
+                "usage": "production",
+                "location_id": by_role["parent"].id,
+                "company_id": self.id,
+                "broiler_role": "consumption",
+            })
+        # Si la transacción se deshace, la caché no debe quedarse con ids inexistentes
+        self.env.cr.postrollback.add(self.env.registry.clear_cache)
+        return {role: loc.id for role, loc in by_role.items()}
@@ -0,0 +1,47 @@
+from odoo import api, fields, models
+
+# Campos cuyo cambio invalida la caché de ubicaciones broiler por empresa
+BROILER_LOCATION_CACHE_FIELDS = {"broiler_role", "active", "company_id", "location_id"}
+
+
+class StockLocation(models.Model):
+    _inherit = "stock.location"
+
+    broiler_role = fields.Selection([
+        ("parent", "Broiler"),
+        ("consumption", "Consumo broiler"),
+    ], string="Función broiler", index=True, copy=False, readonly=True,
+        help="Ubicaciones propias del módulo, una de cada función por empresa.")
+
+    def init(self):
+        # Garantiza en base de datos una sola ubicación de cada función por empresa,
+        # aunque dos workers intenten crearla a la vez
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS stock_location_broiler_role_company_uniq
+            ON stock_location (COALESCE(company_id, 0), broiler_role)
+            WHERE broiler_role IS NOT NULL
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        locations = super().create(vals_list)
+        # Las ubicaciones de cada lote no tienen función broiler: no tocan la caché
+        if any(loc.broiler_role for loc in locations):
+            self.env.registry.clear_cache()
+        return locations
+
+    def write(self, vals):
+        # Solo las ubicaciones con función broiler (antes o después) están en la caché
+        track = bool(BROILER_LOCATION_CACHE_FIELDS.intersection(vals))
+        had_role = track and any(loc.broiler_role for loc in self)
+        res = super().write(vals)
+        if track and (had_role or vals.get("broiler_role")):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        clear = any(loc.broiler_role for loc in self)
+        res = super().unlink()
+        if clear:
+            self.env.registry.clear_cache()
+        return res
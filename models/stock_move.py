@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class StockMove(models.Model):
@@ -10,3 +10,22 @@ class StockMove(models.Model):
         index=True,
         ondelete="set null",
     )
+
+    @api.model
+    def _prepare_merge_moves_distinct_fields(self):
+        # En los pickings consolidados cada movimiento debe seguir ligado a su registro diario
+        return super()._prepare_merge_moves_distinct_fields() + ["broiler_daily_log_id"]
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "state" in vals:
+            # El estado del picking se recalcula desde sus movimientos sin pasar por write
+            self.picking_id._mark_broiler_dashboard_dirty()
+        return res
+
+    def _action_done(self, cancel_backorder=False):
+        moves = super()._action_done(cancel_backorder=cancel_backorder)
+        # Invalida el stock disponible mostrado en los lotes que usan estos productos
+        done_templates = moves.filtered(lambda m: m.state == "done").product_id.product_tmpl_id
+        self.env["broiler.flock"].sudo()._invalidate_stock_available(done_templates)
+        return moves
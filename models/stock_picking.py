@@ -1,8 +1,11 @@
 import logging
 import uuid
+from collections import defaultdict
 
 from odoo import api, fields, models
 
+from .broiler_perf_stat import broiler_perf
+
 _logger = logging.getLogger(__name__)
 
 
@@ -10,6 +13,9 @@ class StockPicking(models.Model):
     _inherit = "stock.picking"
 
     broiler_flock_id = fields.Many2one("broiler.flock", string="Lote")
+    # Picking de consumo consolidado (todos los lotes de un día / ubicación origen)
+    broiler_consolidated = fields.Boolean(string="Consumo consolidado", readonly=True, copy=False)
+    broiler_consumption_date = fields.Date(string="Fecha de consumo", readonly=True, copy=False, index=True)
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -19,7 +25,27 @@ class StockPicking(models.Model):
                 if not vals.get('name') or vals.get('name') == '/':
                     suffix = str(uuid.uuid4())[:8].upper()
                     vals['name'] = f"SB_{suffix}"
-        return super().create(vals_list)
+        pickings = super().create(vals_list)
+        pickings._mark_broiler_dashboard_dirty()
+        return pickings
+
+    def write(self, vals):
+        track = {'state', 'picking_type_id', 'company_id'} & set(vals)
+        if track:
+            self._mark_broiler_dashboard_dirty()
+        res = super().write(vals)
+        if track:
+            self._mark_broiler_dashboard_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_broiler_dashboard_dirty()
+        return super().unlink()
+
+    def _mark_broiler_dashboard_dirty(self):
+        """Marca los conteos de pickings del dashboard de las empresas con Salida Broiler."""
+        company_ids = self.filtered(lambda p: p.picking_type_id.sequence_code == 'SB').company_id.ids
+        self.env["broiler.farm.dashboard.snapshot"]._mark_dirty(company_ids, ("pickings",))
 
     @api.onchange("broiler_flock_id")
     def _onchange_broiler_flock_id(self):
@@ -27,30 +53,53 @@ class StockPicking(models.Model):
             if p.broiler_flock_id and p.picking_type_id.code == "incoming":
                 p.location_dest_id = p.broiler_flock_id.location_id
 
+    @broiler_perf
     def button_validate(self):
         res = super().button_validate()
-        for picking in self:
-            if picking.state != 'done':
-                continue
-            if picking.picking_type_id.sequence_code != 'SB':
-                continue
-            if not picking.broiler_flock_id:
-                continue
-            picking._update_broiler_flock_costs()
+        self.filtered(
+            lambda p: p.state == 'done'
+            and p.picking_type_id.sequence_code == 'SB'
+            and (p.broiler_flock_id or p.broiler_consolidated)
+        )._update_broiler_flock_costs()
         return res
 
     def _update_broiler_flock_costs(self):
-        self.ensure_one()
-        flock = self.broiler_flock_id
-        total_cost = 0.0
-        for move in self.move_ids.filtered(lambda m: m.state == 'done'):
-            total_cost += move.quantity * move.product_id.standard_price
-        if total_cost > 0:
-            flock.write({
-                'cost_feed': flock.cost_feed + total_cost,
-                'total_cost': flock.total_cost + total_cost,
+        """Registra el costo de alimento de los pickings en el libro de costos del lote.
+
+        Una sola pasada para todo el conjunto: el costo se agrega por lote, picking y fecha
+        y las líneas se insertan en un solo create. No se lee ni escribe la fila del lote,
+        así que validaciones simultáneas no se pisan.
+        """
+        moves = self.move_ids.filtered(lambda m: m.state == 'done')
+        price_by_product = {product.id: product.standard_price for product in moves.product_id}
+        cost_by_key = defaultdict(float)
+        moves_by_key = defaultdict(list)
+        for move in moves:
+            # En un picking consolidado el lote de cada movimiento viene de su registro diario
+            flock = move.broiler_daily_log_id.flock_id or move.picking_id.broiler_flock_id
+            if not flock:
+                continue
+            # Las devoluciones de consumo (hacia una ubicación interna) restan costo
+            sign = 1 if move.location_id.usage == 'internal' else -1
+            date = move.broiler_daily_log_id.date or fields.Date.context_today(self, move.picking_id.date_done)
+            key = (flock.id, move.picking_id.id, date)
+            cost_by_key[key] += sign * move.quantity * price_by_product[move.product_id.id]
+            moves_by_key[key].append(move.id)
+
+        line_vals = []
+        for (flock_id, picking_id, date), amount in cost_by_key.items():
+            if not amount:
+                continue
+            move_ids = moves_by_key[(flock_id, picking_id, date)]
+            line_vals.append({
+                'flock_id': flock_id,
+                'date': date,
+                'cost_type': 'feed',
+                'amount': amount,
+                'description': 'Consumo de alimento',
+                'picking_id': picking_id,
+                'move_id': move_ids[0] if len(move_ids) == 1 else False,
             })
-            _logger.info(
-                "Costo consumo picking %s - Lote %s: $%.2f",
-                self.name, flock.name, total_cost,
-            )
+        if line_vals:
+            self.env['broiler.flock.cost.line'].sudo().create(line_vals)
+            _logger.info("Costo consumo de %s pickings: %s líneas de costo", len(self), len(line_vals))
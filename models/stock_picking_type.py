@@ -0,0 +1,40 @@
+from odoo import api, fields, models
+
+# Campos cuyo cambio invalida la caché del tipo Salida Broiler por empresa
+BROILER_PICKING_TYPE_CACHE_FIELDS = {"sequence_code", "code", "company_id", "active"}
+
+
+class StockPickingType(models.Model):
+    _inherit = "stock.picking.type"
+
+    broiler_consolidate_daily = fields.Boolean(
+        string="Consolidar consumo broiler por día",
+        help="Si está activo, todo el consumo de alimento de un día y una ubicación origen "
+             "se agrupa en un único picking, con un movimiento por lote y producto.",
+    )
+
+    def _broiler_affects_cache(self):
+        """Solo los tipos Salida Broiler (código SB) están en la caché por empresa."""
+        return any(picking_type.sequence_code == "SB" for picking_type in self)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        picking_types = super().create(vals_list)
+        if picking_types._broiler_affects_cache():
+            self.env.registry.clear_cache()
+        return picking_types
+
+    def write(self, vals):
+        track = bool(BROILER_PICKING_TYPE_CACHE_FIELDS.intersection(vals))
+        was_sb = track and self._broiler_affects_cache()
+        res = super().write(vals)
+        if track and (was_sb or self._broiler_affects_cache()):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        clear = self._broiler_affects_cache()
+        res = super().unlink()
+        if clear:
+            self.env.registry.clear_cache()
+        return res
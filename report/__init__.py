@@ -0,0 +1 @@
+from . import broiler_flock_report
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import api, models
+
+# Campos de broiler.daily.log que usa la plantilla
+REPORT_LOG_FIELDS = [
+    "flock_id", "date", "feed_starter_product_tmpl_id", "feed_starter_kg",
+    "feed_finisher_product_tmpl_id", "feed_finisher_kg", "feed_kg", "water_l",
+    "dead_qty", "culled_qty", "avg_weight_g",
+]
+REPORT_TOTAL_FIELDS = ["feed_starter_kg", "feed_finisher_kg", "feed_kg", "water_l", "dead_qty", "culled_qty"]
+
+
+class ReportBroilerFlock(models.AbstractModel):
+    """Datos del Reporte de Lote precargados para todos los lotes seleccionados.
+
+    En lugar de recorrer ``daily_log_ids`` lote por lote, se leen todos los registros en
+    una consulta, los totales con una agrupación y la curva de crecimiento con una sola
+    pasada del motor; la plantilla solo consulta diccionarios.
+    """
+    _name = "report.broiler_farm.report_broiler_flock"
+    _description = "Reporte de Lote Broiler"
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env["broiler.flock"].browse(docids)
+        # Campos del lote (almacenados y costos) para todo el conjunto de una vez
+        docs.fetch(["name", "state", "company_id", "date_in", "initial_qty", "alive_qty", "total_cost"])
+
+        logs = self.env["broiler.daily.log"].search([("flock_id", "in", docs.ids)], order="flock_id, date, id")
+        logs.fetch(REPORT_LOG_FIELDS)
+        (logs.feed_starter_product_tmpl_id | logs.feed_finisher_product_tmpl_id).fetch(["name"])
+        log_ids_by_flock = defaultdict(list)
+        for log in logs:
+            log_ids_by_flock[log.flock_id.id].append(log.id)
+        # Mismo prefetch para todos: el primer acceso a un campo lo carga para todos los registros
+        logs_by_flock = defaultdict(lambda: logs.browse())
+        logs_by_flock.update({
+            flock_id: logs.browse(ids).with_prefetch(logs._prefetch_ids)
+            for flock_id, ids in log_ids_by_flock.items()
+        })
+
+        totals_by_flock = defaultdict(lambda: dict.fromkeys(REPORT_TOTAL_FIELDS, 0))
+        for flock, *sums in self.env["broiler.daily.log"]._read_group(
+            [("flock_id", "in", docs.ids)],
+            ["flock_id"],
+            [f"{field}:sum" for field in REPORT_TOTAL_FIELDS],
+        ):
+            totals_by_flock[flock.id] = dict(zip(REPORT_TOTAL_FIELDS, (value or 0 for value in sums)))
+
+        return {
+            "doc_ids": docids,
+            "doc_model": "broiler.flock",
+            "docs": docs,
+            "logs_by_flock": logs_by_flock,
+            "totals_by_flock": totals_by_flock,
+            "growth_by_log": self.env["broiler.growth.engine"]._compute_series(docs),
+        }
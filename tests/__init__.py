@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+from . import test_benchmark
+from . import test_data_export
+from . import test_flock_age
+from . import test_flock_kpis
+from . import test_flock_sequence
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import random
+
+from odoo.tests import TransactionCase, tagged
+
+from ..tools.bench import FarmBench, write_report
+
+# Rutas que debe medir el benchmark (ver FarmBench.run)
+BENCH_PATHS = {
+    "daily_log_create_batch", "daily_log_create_single", "daily_log_write_single",
+    "daily_log_write_batch", "sync_stock_consumption_moves", "flock_compute_kpis",
+    "dashboard_snapshot_refresh", "dashboard_load", "action_reprocess_stock_moves",
+    "sb_picking_validation",
+}
+
+
+@tagged("-standard", "-at_install", "post_install", "broiler_bench")
+class TestBroilerBenchmark(TransactionCase):
+    """Benchmark sobre una granja sintética pequeña.
+
+    No corre con las pruebas estándar: se pide con ``--test-tags broiler_bench``.
+    El tamaño se ajusta con BROILER_BENCH_COMPANIES / _FLOCKS / _DAYS y, si se define
+    BROILER_BENCH_OUTPUT, los resultados se escriben en ese archivo JSON.
+    """
+
+    def test_benchmark_hot_paths(self):
+        params = {
+            "companies": int(os.environ.get("BROILER_BENCH_COMPANIES", 1)),
+            "flocks": int(os.environ.get("BROILER_BENCH_FLOCKS", 3)),
+            "days": int(os.environ.get("BROILER_BENCH_DAYS", 14)),
+            "seed": 42,
+        }
+        env = self.env(context=dict(self.env.context, tracking_disable=True))
+        bench = FarmBench(env, random.Random(params["seed"]))
+        results = bench.run(params["companies"], params["flocks"], params["days"])
+
+        measured = {row["path"] for row in results["paths"]}
+        self.assertEqual(measured, BENCH_PATHS)
+        for row in results["paths"]:
+            self.assertGreaterEqual(row["wall_s"], 0)
+            self.assertGreaterEqual(row["queries"], 0)
+        if os.environ.get("BROILER_BENCH_OUTPUT"):
+            write_report(os.environ["BROILER_BENCH_OUTPUT"], env, params, results)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import tempfile
+
+from odoo.tests import HttpCase, tagged
+
+
+@tagged("-at_install", "post_install")
+class TestDataExport(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.env.company.broiler_deferred_stock_sync = True
+        feed = cls.env["product.template"].create({"name": "Alimento Exportación", "type": "consu"})
+        flock = cls.env["broiler.flock"].create({
+            "date_in": datetime.datetime(2025, 3, 1, 6, 0),
+            "initial_qty": 8000,
+            "initial_weight_g": 40.0,
+            "feed_starter_product_tmpl_id": feed.id,
+            "feed_finisher_product_tmpl_id": feed.id,
+        })
+        flock.action_set_active()
+        cls.env["broiler.daily.log"].create([{
+            "flock_id": flock.id,
+            "date": datetime.date(2025, 3, 1) + datetime.timedelta(days=day),
+            "dead_qty": day % 4,
+            "feed_starter_product_tmpl_id": feed.id,
+            "feed_finisher_product_tmpl_id": feed.id,
+            "feed_starter_kg": 100.0 + day,
+            "water_l": 200.0 + day,
+        } for day in range(1, 8)])
+
+    def _expected_csv(self, company):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        try:
+            self.env["broiler.data.export"]._export_daily_logs(
+                path, file_format="csv", company_ids=company.ids,
+            )
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+    def test_download_csv(self):
+        wizard = self.env["broiler.data.export.wizard"].create({
+            "company_ids": [(6, 0, self.env.company.ids)],
+            "file_format": "csv",
+        })
+        wizard.action_export()
+        attachment = wizard.attachment_id
+        self.assertEqual(wizard.row_count, 7)
+        self.assertTrue(attachment.file_size)
+
+        self.authenticate("admin", "admin")
+        response = self.url_open(wizard.action_download()["url"])
+        self.assertEqual(response.status_code, 200)
+        expected = self._expected_csv(self.env.company)
+        self.assertEqual(response.content, expected)
+        self.assertEqual(attachment.raw, expected)
+        self.assertEqual(len(expected.splitlines()), wizard.row_count + 1)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from odoo import fields
+from odoo.tests import TransactionCase
+
+
+class TestFlockAge(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.feed = cls.env["product.template"].create({"name": "Alimento Edad", "type": "consu"})
+
+    def test_activation_refreshes_stale_age(self):
+        date_in = fields.Datetime.now() - datetime.timedelta(days=10)
+        flock = self.env["broiler.flock"].create({
+            "date_in": date_in,
+            "initial_qty": 1000,
+            "feed_starter_product_tmpl_id": self.feed.id,
+            "feed_finisher_product_tmpl_id": self.feed.id,
+        })
+        expected = flock.age_days
+        # El cron diario solo avanza los activos: en borrador la edad queda como al crearlo
+        flock.flush_recordset()
+        self.env.cr.execute("UPDATE broiler_flock SET age_days = 2 WHERE id = %s", [flock.id])
+        flock.invalidate_recordset(["age_days"])
+        self.assertEqual(flock.age_days, 2)
+
+        flock.action_set_active()
+        self.assertEqual(flock.age_days, expected)
+        self.assertGreaterEqual(flock.age_days, 9)
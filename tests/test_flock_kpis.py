@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import datetime
+import random
+
+from odoo.tests import TransactionCase
+
+
+def reference_kpis(flock):
+    """KPIs como se calculaban antes por lote, con mapped() y sorted("date")."""
+    logs = flock.daily_log_ids
+    dead = sum(logs.mapped("dead_qty"))
+    culled = sum(logs.mapped("culled_qty"))
+    total_out = dead + culled
+    alive = max((flock.initial_qty or 0) - total_out, 0)
+    feed = sum(logs.mapped("feed_kg"))
+    last_with_weight = logs.filtered(lambda x: x.avg_weight_g and x.avg_weight_g > 0).sorted("date")
+    avg_weight = last_with_weight[-1].avg_weight_g if last_with_weight else 0.0
+    gain_per_bird_kg = max((avg_weight - flock.initial_weight_g) / 1000.0, 0.0)
+    total_gain_kg = gain_per_bird_kg * alive
+    return {
+        "dead_qty": dead,
+        "culled_qty": culled,
+        "alive_qty": alive,
+        "mortality_pct": (total_out / flock.initial_qty * 100.0) if flock.initial_qty else 0.0,
+        "feed_total_kg": feed,
+        "water_total_l": sum(logs.mapped("water_l")),
+        "avg_weight_g": avg_weight,
+        "fcr": (feed / total_gain_kg) if total_gain_kg > 0 else 0.0,
+    }
+
+
+class TestFlockKpis(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        # Sin movimientos de stock inmediatos: la prueba es sobre los acumulados
+        cls.env.company.broiler_deferred_stock_sync = True
+        cls.starter, cls.finisher = cls.env["product.template"].create([
+            {"name": "Inicio KPI", "type": "consu"},
+            {"name": "Final KPI", "type": "consu"},
+        ])
+        cls.rng = random.Random(20240601)
+        cls.date_in = datetime.datetime(2025, 3, 1, 6, 0)
+        cls.flocks = cls.env["broiler.flock"].create([{
+            "date_in": cls.date_in,
+            "initial_qty": cls.rng.randint(5000, 15000),
+            "initial_weight_g": 40.0,
+            "feed_starter_product_tmpl_id": cls.starter.id,
+            "feed_finisher_product_tmpl_id": cls.finisher.id,
+        } for _i in range(6)])
+        cls.flocks.action_set_active()
+
+        vals_list = []
+        # El último lote queda sin registros y el penúltimo sin pesajes
+        for index, flock in enumerate(cls.flocks[:-1]):
+            weighed = index != len(cls.flocks) - 2
+            for day in range(1, 29):
+                # Algunos días con dos registros (empates de fecha, también con peso)
+                for _n in range(cls.rng.choice((1, 1, 1, 2))):
+                    sampled = weighed and cls.rng.random() < 0.35
+                    vals_list.append({
+                        "flock_id": flock.id,
+                        "date": cls.date_in.date() + datetime.timedelta(days=day),
+                        "feed_starter_product_tmpl_id": cls.starter.id,
+                        "feed_finisher_product_tmpl_id": cls.finisher.id,
+                        "feed_starter_kg": round(cls.rng.uniform(0, 400), 3) if day <= 14 else 0.0,
+                        "feed_finisher_kg": round(cls.rng.uniform(0, 900), 3) if day > 14 else 0.0,
+                        "water_l": round(cls.rng.uniform(0, 2000), 2),
+                        "dead_qty": cls.rng.randint(0, 12),
+                        "culled_qty": cls.rng.randint(0, 4),
+                        "avg_weight_g": round(cls.rng.uniform(40, 2800), 2) if sampled else 0.0,
+                        "sample_size": 50 if sampled else 0,
+                    })
+        # En orden aleatorio, para que el id no siga a la fecha
+        cls.rng.shuffle(vals_list)
+        cls.logs = cls.env["broiler.daily.log"].create(vals_list)
+
+    def assertKpisMatchReference(self, flocks):
+        flocks.invalidate_recordset()
+        for flock in flocks:
+            expected = reference_kpis(flock)
+            for fname, value in expected.items():
+                self.assertAlmostEqual(flock[fname], value, places=2, msg="%s: %s" % (flock.name, fname))
+
+    def test_grouped_totals_match_reference(self):
+        totals = self.flocks._get_log_kpi_totals()
+        for flock in self.flocks:
+            expected = reference_kpis(flock)
+            got = totals.get(flock.id)
+            if not flock.daily_log_ids:
+                self.assertIsNone(got)
+                continue
+            for fname in ("dead_qty", "culled_qty", "feed_total_kg", "water_total_l", "avg_weight_g"):
+                self.assertAlmostEqual(got[fname], expected[fname], places=3, msg="%s: %s" % (flock.name, fname))
+
+    def test_stored_kpis_match_reference(self):
+        self.assertKpisMatchReference(self.flocks)
+
+    def test_same_day_weight_tie(self):
+        flock = self.flocks[0]
+        day = self.date_in.date() + datetime.timedelta(days=40)
+        first, second = self.env["broiler.daily.log"].create([
+            {"flock_id": flock.id, "date": day, "avg_weight_g": 2900.0, "sample_size": 30},
+            {"flock_id": flock.id, "date": day, "avg_weight_g": 2950.0, "sample_size": 30},
+        ])
+        self.assertEqual(flock.last_weight_log_id, first)
+        self.assertKpisMatchReference(flock)
+
+    def test_kpis_after_writes_and_unlinks(self):
+        weighed = self.logs.filtered(lambda l: l.avg_weight_g > 0)
+        # El último pesaje de cada lote deja de serlo: sin peso, a otra fecha o eliminado
+        latest = self.env["broiler.daily.log"]
+        for flock in weighed.flock_id:
+            latest |= flock.last_weight_log_id
+        latest[0::3].write({"avg_weight_g": 0.0, "sample_size": 0})
+        latest[1::3].write({"date": self.date_in.date()})
+        latest[2::3].unlink()
+        (self.logs.exists() - weighed)[:20].write({"dead_qty": 3, "feed_starter_kg": 10.0, "feed_finisher_kg": 0.0})
+        self.assertKpisMatchReference(self.flocks)
+
+    def test_rebuild_matches_reference(self):
+        self.env.cr.execute(
+            "UPDATE broiler_flock SET dead_qty = 0, feed_total_kg = 0, avg_weight_g = 0 WHERE id IN %s",
+            (tuple(self.flocks.ids),),
+        )
+        self.flocks.invalidate_recordset()
+        self.flocks._rebuild_kpis()
+        self.assertKpisMatchReference(self.flocks)
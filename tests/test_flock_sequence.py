@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from odoo.tests import TransactionCase
+
+
+class TestFlockSequence(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.env.company.partner_id.tz = "America/Tegucigalpa"
+        cls.feed = cls.env["product.template"].create({"name": "Alimento Secuencia", "type": "consu"})
+
+    def test_back_dated_name_uses_local_date_in(self):
+        # 03:00 UTC del 15 de enero es todavía el 14 en Honduras (UTC-6)
+        date_in = datetime.datetime(2024, 1, 15, 3, 0)
+        flocks = self.env["broiler.flock"].create([{
+            "date_in": date_in,
+            "initial_qty": 1000,
+            "feed_starter_product_tmpl_id": self.feed.id,
+            "feed_finisher_product_tmpl_id": self.feed.id,
+        } for _i in range(2)])
+        for flock in flocks:
+            self.assertRegex(flock.name, r"^LOTE_14012024-\d{4}$")
+            self.assertTrue(flock.name.startswith(flock._lote_date_prefix(date_in) + "-"))
+        self.assertNotEqual(flocks[0].name, flocks[1].name)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Granja sintética y mediciones de las rutas críticas del módulo.
+
+Lo usan el comando ``odoo-bin broiler_bench`` y el caso de benchmark (``tests/test_benchmark``);
+está fuera de ``tests`` para que el comando no cargue el paquete de pruebas en producción.
+"""
+import datetime
+import json
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+def write_report(path, env, params, results):
+    """Escribe en ``path`` el JSON comparable entre versiones y lo devuelve."""
+    report = {
+        "module_version": results["module_version"],
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "database": env.cr.dbname,
+        "params": params,
+        "results": results["paths"],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+class FarmBench:
+    """Generador de la granja sintética y mediciones."""
+
+    def __init__(self, env, rng):
+        self.env = env
+        self.rng = rng
+        self.paths = []
+
+    def measure(self, path, func, records=0):
+        """Ejecuta ``func`` con caché vacía y registra tiempo y consultas (incluye el flush)."""
+        env = self.env
+        env.flush_all()
+        env.invalidate_all()
+        queries = env.cr.sql_log_count
+        start = time.perf_counter()
+        result = func()
+        env.flush_all()
+        row = {
+            "path": path,
+            "wall_s": round(time.perf_counter() - start, 4),
+            "queries": env.cr.sql_log_count - queries,
+            "records": records,
+        }
+        self.paths.append(row)
+        _logger.info("broiler_bench %s: %s", path, row)
+        return result
+
+    # -------------------------
+    # Datos sintéticos
+    # -------------------------
+    def create_companies(self, count):
+        companies = self.env["res.company"].create([{"name": "Granja Bench %s" % (i + 1)} for i in range(count)])
+        PickingType = self.env["stock.picking.type"]
+        for company in companies:
+            warehouse = self.env["stock.warehouse"].search([("company_id", "=", company.id)], limit=1)
+            PickingType.create({
+                "name": "Salida Broiler",
+                "code": "outgoing",
+                "sequence_code": "SB",
+                "company_id": company.id,
+                "warehouse_id": warehouse.id,
+                "default_location_src_id": company._broiler_get_stock_location().id,
+                "default_location_dest_id": company._broiler_get_consumption_location().id,
+            })
+        return companies
+
+    def create_feed_products(self):
+        return self.env["product.template"].create([
+            {"name": "Alimento Inicio Bench", "type": "consu", "is_storable": True, "standard_price": 0.55},
+            {"name": "Alimento Final Bench", "type": "consu", "is_storable": True, "standard_price": 0.48},
+        ])
+
+    def stock_feed(self, companies, templates, qty):
+        Quant = self.env["stock.quant"]
+        for company in companies:
+            location = company._broiler_get_stock_location()
+            for variant in templates.product_variant_ids:
+                Quant.with_company(company)._update_available_quantity(variant, location, qty)
+
+    def create_flocks(self, companies, templates, per_company, days):
+        starter, finisher = templates
+        date_in = datetime.datetime.now().replace(hour=6, minute=0, second=0, microsecond=0) \
+            - datetime.timedelta(days=days)
+        flocks = self.env["broiler.flock"].create([
+            {
+                "company_id": company.id,
+                "date_in": date_in,
+                "initial_qty": self.rng.randint(8000, 20000),
+                "farm_name": "Granja %s" % (i % 3 + 1),
+                "house": "G%02d" % (i + 1),
+                "strain": self.rng.choice(["Cobb 500", "Ross 308"]),
+                "supplier": "Incubadora %s" % self.rng.choice("AB"),
+                "feed_starter_product_tmpl_id": starter.id,
+                "feed_finisher_product_tmpl_id": finisher.id,
+            }
+            for company in companies
+            for i in range(per_company)
+        ])
+        flocks.action_set_active()
+        return flocks
+
+    def daily_log_values(self, flocks, days):
+        vals_list = []
+        for flock in flocks:
+            start = flock.date_in.date()
+            for day in range(1, days + 1):
+                birds = flock.initial_qty
+                grams_per_bird = 15 + 4.2 * day
+                weighed = day % 7 == 0
+                vals_list.append({
+                    "flock_id": flock.id,
+                    "date": start + datetime.timedelta(days=day),
+                    "feed_starter_kg": round(birds * grams_per_bird / 1000, 1) if day <= 14 else 0.0,
+                    "feed_finisher_kg": round(birds * grams_per_bird / 1000, 1) if day > 14 else 0.0,
+                    "water_l": round(birds * grams_per_bird * 1.8 / 1000, 1),
+                    "dead_qty": self.rng.randint(0, max(1, birds // 2000)),
+                    "culled_qty": self.rng.randint(0, 3),
+                    "avg_weight_g": round(42 * 1.11 ** min(day, 35) + self.rng.uniform(-20, 20), 1) if weighed else 0.0,
+                    "sample_size": 50 if weighed else 0,
+                })
+        return vals_list
+
+    # -------------------------
+    # Rutas medidas
+    # -------------------------
+    def run(self, n_companies, n_flocks, n_days):
+        env = self.env
+        companies = self.create_companies(n_companies)
+        templates = self.create_feed_products()
+        self.stock_feed(companies, templates, qty=10.0 ** 9)
+        flocks = self.create_flocks(companies, templates, n_flocks, n_days)
+        Log = env["broiler.daily.log"]
+
+        # Un día de cada lote queda fuera de la carga masiva para medir el alta individual
+        vals_list = self.daily_log_values(flocks, n_days)
+        last_date = max(vals["date"] for vals in vals_list)
+        single_vals = [vals for vals in vals_list if vals["date"] == last_date]
+        batch_vals = [vals for vals in vals_list if vals["date"] != last_date]
+        logs = self.measure("daily_log_create_batch", lambda: Log.create(batch_vals), len(batch_vals))
+        log = self.measure("daily_log_create_single", lambda: Log.create(single_vals[0]), 1)
+        logs |= log
+        if single_vals[1:]:
+            logs |= Log.create(single_vals[1:])
+
+        self.measure(
+            "daily_log_write_single",
+            lambda: log.write({"feed_finisher_kg": log.feed_finisher_kg + 10, "dead_qty": log.dead_qty + 1}),
+            1,
+        )
+        last_logs = logs.filtered(lambda l: l.date == log.date)
+        self.measure(
+            "daily_log_write_batch",
+            lambda: last_logs.write({"water_l": 1000.0}),
+            len(last_logs),
+        )
+        self.measure("sync_stock_consumption_moves", last_logs._sync_stock_consumption_moves, len(last_logs))
+
+        self.measure("flock_compute_kpis", flocks._compute_kpis, len(flocks))
+
+        self.measure(
+            "dashboard_snapshot_refresh",
+            lambda: env["broiler.farm.dashboard.snapshot"]._refresh_companies(companies),
+            len(companies),
+        )
+        Dashboard = env["broiler.farm.dashboard"].with_company(companies[0])
+        dashboard = Dashboard.search([], limit=1) or Dashboard.create({})
+        self.measure("dashboard_load", lambda: dashboard.read(list(Dashboard._fields)), 1)
+
+        # Ruta síncrona (selección de hasta un bloque); la del job confirma por bloques
+        chunk_size = env["broiler.reprocess.job"].default_get(["chunk_size"]).get("chunk_size") or 200
+        reprocess_logs = logs.sorted("id")[:chunk_size]
+        self.measure("action_reprocess_stock_moves", reprocess_logs.action_reprocess_stock_moves, len(reprocess_logs))
+
+        pickings = env["stock.picking"].search(
+            [("company_id", "in", companies.ids), ("state", "in", ("assigned", "confirmed", "waiting"))]
+            + env["broiler.farm.dashboard.snapshot"]._get_broiler_picking_domain(companies)
+        )
+        self.measure(
+            "sb_picking_validation",
+            lambda: pickings.with_context(skip_backorder=True, skip_sms=True).button_validate(),
+            len(pickings),
+        )
+
+        module = env["ir.module.module"].search([("name", "=", "broiler_farm")], limit=1)
+        return {"module_version": module.latest_version, "paths": self.paths}
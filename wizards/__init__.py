@@ -1,2 +1,5 @@
 # -*- coding: utf-8 -*-
-from . import broiler_flock_cost_wizard
\ No newline at end of file
+from . import broiler_flock_cost_wizard
+from . import broiler_daily_log_import_wizard
+from . import broiler_sb_validate_wizard
+from . import broiler_data_export_wizard
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import json
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+
+
+class BroilerDailyLogImportWizard(models.TransientModel):
+    _name = 'broiler.daily.log.import.wizard'
+    _description = 'Importar Registros Diarios (CSV/JSON)'
+
+    file = fields.Binary(string='Archivo', required=True)
+    filename = fields.Char(string='Nombre del archivo')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+    ], string='Formato', compute='_compute_file_format', store=True, readonly=False)
+    delimiter = fields.Char(string='Separador CSV', default=',', size=1)
+    state = fields.Selection([('draft', 'Borrador'), ('done', 'Importado')], default='draft')
+    created_count = fields.Integer(string='Registros creados', readonly=True)
+    error_count = fields.Integer(string='Filas con error', readonly=True)
+    result_text = fields.Text(string='Errores', readonly=True)
+
+    @api.depends('filename')
+    def _compute_file_format(self):
+        for wizard in self:
+            if wizard.filename and wizard.filename.lower().endswith('.json'):
+                wizard.file_format = 'json'
+            else:
+                wizard.file_format = 'csv'
+
+    def _read_rows(self):
+        """Filas del archivo como lista de dicts (columnas = campos de import_daily_logs)."""
+        self.ensure_one()
+        content = base64.b64decode(self.file or b'').decode('utf-8-sig')
+        if self.file_format == 'json':
+            try:
+                rows = json.loads(content)
+            except ValueError as e:
+                raise UserError(f'El archivo JSON no es válido: {e}')
+            if not isinstance(rows, list):
+                raise UserError('El archivo JSON debe contener una lista de registros.')
+            return rows
+        reader = csv.DictReader(io.StringIO(content), delimiter=self.delimiter or ',')
+        return [{key.strip(): (value or '').strip() for key, value in row.items() if key} for row in reader]
+
+    def action_import(self):
+        """Importar el archivo con la carga masiva de registros diarios"""
+        self.ensure_one()
+        rows = self._read_rows()
+        if not rows:
+            raise UserError('El archivo no contiene registros.')
+
+        result = self.env['broiler.daily.log'].import_daily_logs(rows)
+        self.write({
+            'state': 'done',
+            'created_count': len(result['created']),
+            'error_count': len(result['errors']),
+            'result_text': '\n'.join(
+                f"Fila {error['row']}: {error['error']}" for error in result['errors']
+            ),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+from odoo import fields, models
+
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class BroilerDataExportWizard(models.TransientModel):
+    _name = 'broiler.data.export.wizard'
+    _description = 'Exportar Registros Diarios (CSV/Parquet)'
+
+    company_ids = fields.Many2many('res.company', string='Empresas', default=lambda self: self.env.company)
+    date_from = fields.Date(string='Desde')
+    date_to = fields.Date(string='Hasta')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('parquet', 'Parquet'),
+    ], string='Formato', default='csv', required=True)
+    incremental = fields.Boolean(
+        string='Solo cambios desde la última exportación',
+        help='Exporta solo los registros modificados desde la última exportación incremental '
+             'con las mismas empresas y fechas.',
+    )
+    state = fields.Selection([('draft', 'Borrador'), ('done', 'Exportado')], default='draft')
+    row_count = fields.Integer(string='Filas exportadas', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Archivo', readonly=True)
+
+    def unlink(self):
+        attachments = self.attachment_id
+        res = super().unlink()
+        attachments.sudo().unlink()
+        return res
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.attachment_id.id,
+            'target': 'self',
+        }
+
+    def action_export(self):
+        """Exportar a un archivo temporal y dejarlo para descargar"""
+        self.ensure_one()
+        # La exportación lee con SQL: limitar a las empresas permitidas del usuario
+        self.env['broiler.daily.log'].check_access('read')
+        companies = (self.company_ids or self.env.companies) & self.env.user.company_ids
+        filename = 'registros_diarios_%s.%s' % (fields.Date.context_today(self).strftime('%Y%m%d'), self.file_format)
+        fd, path = tempfile.mkstemp(suffix='.' + self.file_format)
+        os.close(fd)
+        try:
+            total = self.env['broiler.data.export']._export_daily_logs(
+                path,
+                file_format=self.file_format,
+                date_from=self.date_from,
+                date_to=self.date_to,
+                company_ids=companies.ids,
+                incremental=self.incremental,
+            )
+            # Se guarda desde el disco: el archivo nunca se carga entero en memoria
+            attachment = self.env['broiler.data.export']._create_attachment_from_file(
+                path, filename, EXPORT_MIMETYPES[self.file_format],
+            )
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+        self.write({
+            'state': 'done',
+            'row_count': total,
+            'attachment_id': attachment.id,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
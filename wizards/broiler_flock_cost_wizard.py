@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models
 
+from ..models.broiler_flock_cost_line import COST_TYPES
+
 
 class BroilerFlockCostWizard(models.TransientModel):
     _name = 'broiler.flock.cost.wizard'
@@ -9,15 +11,10 @@ class BroilerFlockCostWizard(models.TransientModel):
     flock_id = fields.Many2one('broiler.flock', string='Lote', required=True)
     cost_description = fields.Char(string='Descripción del Costo', required=True)
     cost_amount = fields.Float(string='Monto del Costo', required=True, digits=(16, 2))
-    cost_type = fields.Selection([
-        ('medicine', 'Medicina'),
-        ('vaccine', 'Vacuna'),
-        ('labor', 'Mano de Obra'),
-        ('electricity', 'Electricidad'),
-        ('water', 'Agua'),
-        ('other', 'Otro'),
-    ], string='Tipo de Costo', required=True, default='other')
-    
+    cost_type = fields.Selection(
+        [t for t in COST_TYPES if t[0] != 'feed'], string='Tipo de Costo', required=True, default='other',
+    )
+
     @api.model
     def default_get(self, fields):
         res = super().default_get(fields)
@@ -32,10 +29,12 @@ class BroilerFlockCostWizard(models.TransientModel):
         if not self.flock_id:
             return {'type': 'ir.actions.act_window_close'}
         
-        # Actualizar costos acumulados
-        self.flock_id.write({
-            'cost_other': self.flock_id.cost_other + self.cost_amount,
-            'total_cost': self.flock_id.total_cost + self.cost_amount,
+        # Línea en el libro de costos; los totales del lote se calculan a partir de él
+        self.env['broiler.flock.cost.line'].create({
+            'flock_id': self.flock_id.id,
+            'cost_type': self.cost_type,
+            'amount': self.cost_amount,
+            'description': self.cost_description,
         })
         
         # Crear nota en el registro diario actual si existe
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class BroilerSbValidateWizard(models.TransientModel):
+    _name = 'broiler.sb.validate.wizard'
+    _description = 'Validar Pickings Salida Broiler pendientes'
+
+    company_id = fields.Many2one('res.company', string='Empresa', required=True, default=lambda self: self.env.company)
+    date_from = fields.Date(string='Desde')
+    date_to = fields.Date(string='Hasta', default=fields.Date.context_today)
+    farm_name = fields.Char(string='Granja')
+    ready_count = fields.Integer(string='Listos para validar', compute='_compute_counts')
+    waiting_count = fields.Integer(string='Sin reserva completa', compute='_compute_counts')
+    state = fields.Selection([('draft', 'Borrador'), ('done', 'Validado')], default='draft')
+    validated_count = fields.Integer(string='Pickings validados', readonly=True)
+
+    def _get_pending_domain(self):
+        self.ensure_one()
+        domain = [
+            ('company_id', '=', self.company_id.id),
+            ('state', 'in', ('assigned', 'waiting', 'confirmed')),
+        ] + self.env['broiler.farm.dashboard.snapshot']._get_broiler_picking_domain(self.company_id)
+        if self.date_from:
+            domain.append(('scheduled_date', '>=', fields.Datetime.to_datetime(self.date_from)))
+        if self.date_to:
+            domain.append(('scheduled_date', '<', fields.Datetime.to_datetime(fields.Date.add(self.date_to, days=1))))
+        if self.farm_name:
+            # En los consolidados la granja sale del lote de cada movimiento
+            domain += [
+                '|',
+                ('broiler_flock_id.farm_name', '=ilike', self.farm_name),
+                ('move_ids.broiler_daily_log_id.flock_id.farm_name', '=ilike', self.farm_name),
+            ]
+        return domain
+
+    @api.depends('company_id', 'date_from', 'date_to', 'farm_name')
+    def _compute_counts(self):
+        Picking = self.env['stock.picking']
+        for wizard in self:
+            counts = dict(Picking._read_group(wizard._get_pending_domain(), ['state'], ['__count']))
+            wizard.ready_count = counts.get('assigned', 0)
+            wizard.waiting_count = counts.get('waiting', 0) + counts.get('confirmed', 0)
+
+    def action_validate(self):
+        """Valida en un solo lote todos los pickings listos del filtro (cierre del día).
+
+        button_validate recibe el conjunto completo: el costo de alimento de todos los
+        lotes se registra en una sola pasada (ver stock.picking._update_broiler_flock_costs).
+        """
+        self.ensure_one()
+        pickings = self.env['stock.picking'].search(self._get_pending_domain() + [('state', '=', 'assigned')])
+        if not pickings:
+            raise UserError('No hay pickings Salida Broiler listos para validar con ese filtro.')
+
+        start = time.monotonic()
+        res = pickings.with_context(
+            skip_backorder=True,
+            picking_ids_not_to_backorder=pickings.ids,
+        ).button_validate()
+        if isinstance(res, dict):
+            # Otro asistente de stock pide confirmación: se muestra al usuario
+            return res
+        validated = pickings.filtered(lambda p: p.state == 'done')
+        _logger.info(
+            "Cierre Salida Broiler: %s pickings validados en %.2fs",
+            len(validated), time.monotonic() - start,
+        )
+        self.write({'state': 'done', 'validated_count': len(validated)})
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }